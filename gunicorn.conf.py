@@ -0,0 +1,45 @@
+import os
+
+# Same numbers the laundry_api.checks connection budget is validated with
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+
+
+def on_starting(server):
+    """
+    Refuse to boot when the workers would exhaust the database's
+    connections.
+    """
+    import django
+    from django.core import checks
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'laundry_project.settings')
+    django.setup()
+    errors = [
+        message for message in checks.run_checks(tags=['database_pool'])
+        if message.is_serious()
+    ]
+    if errors:
+        raise SystemExit('\n'.join(str(error) for error in errors))
+
+
+def _flush_last_login():
+    from laundry_api.utils import last_login
+
+    last_login.flush_on_exit()
+
+
+def worker_exit(server, worker):
+    """
+    Write buffered last_login timestamps before a worker goes away, e.g.
+    after max_requests or a reload.
+    """
+    _flush_last_login()
+
+
+def worker_abort(worker):
+    """
+    Same for a worker that missed its timeout; the arbiter kills it soon
+    after this runs.
+    """
+    _flush_last_login()
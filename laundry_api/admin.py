@@ -1,17 +1,29 @@
 from django.contrib import admin
+from .db_router import replica_reads
 from .models import (
     Customer, Staff, GarmentType, ServiceType,
-    Order, OrderItem, Invoice, Payment, Feedback
+    Order, OrderItem, Invoice, Payment, Feedback, NotificationOutbox
 )
 
+class ReplicaChangeListMixin:
+    """Changelist pages read from a replica; actions and edits don't"""
+
+    def changelist_view(self, request, extra_context=None):
+        with replica_reads(request):
+            response = super().changelist_view(request, extra_context)
+            # The result list is only queried when the template renders
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'phone', 'created_at']
     search_fields = ['name', 'email', 'phone']
     list_filter = ['created_at']
 
 @admin.register(Staff)
-class StaffAdmin(admin.ModelAdmin):
+class StaffAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['name', 'role', 'phone', 'is_active', 'created_at']
     search_fields = ['name', 'phone']
     list_filter = ['role', 'is_active', 'created_at']
@@ -32,7 +44,7 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ['unit_price', 'total_price']
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['order_number', 'customer', 'service_type', 'delivery_type', 'total_amount', 'status', 'created_at']
     search_fields = ['order_number', 'customer__name']
     list_filter = ['status', 'service_type', 'delivery_type', 'created_at']
@@ -40,21 +52,28 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = [OrderItemInline]
 
 @admin.register(Invoice)
-class InvoiceAdmin(admin.ModelAdmin):
+class InvoiceAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['invoice_number', 'order', 'issued_date', 'due_date']
     search_fields = ['invoice_number', 'order__order_number']
     list_filter = ['issued_date', 'due_date']
     readonly_fields = ['invoice_number', 'issued_date']
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['invoice', 'amount', 'payment_method', 'status', 'payment_date']
     search_fields = ['invoice__invoice_number', 'transaction_reference']
     list_filter = ['status', 'payment_method', 'payment_date']
 
 @admin.register(Feedback)
-class FeedbackAdmin(admin.ModelAdmin):
+class FeedbackAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['customer', 'order', 'rating', 'created_at']
     search_fields = ['customer__name', 'order__order_number']
     list_filter = ['rating', 'created_at']
-    readonly_fields = ['created_at']
\ No newline at end of file
+    readonly_fields = ['created_at']
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
+    list_display = ['recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    search_fields = ['recipient', 'dedup_key']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['dedup_key', 'created_at', 'sent_at']
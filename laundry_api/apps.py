@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class LaundryApiConfig(AppConfig):
     name = 'laundry_api'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
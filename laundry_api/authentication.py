@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .utils import jwt_cache, revocation
+
+DEFAULT_USER_CACHE_TTL = 30
+DEFAULT_USER_CACHE_SIZE = 10000
+
+_lock = threading.Lock()
+# user id -> (expires at, User), least recently used first
+_users = OrderedDict()
+
+
+def _user_cache_ttl():
+    return getattr(settings, 'AUTH_USER_CACHE_TTL', DEFAULT_USER_CACHE_TTL)
+
+
+def _user_id(value):
+    # Tokens store the id as a string
+    return get_user_model()._meta.pk.to_python(value)
+
+
+def load_user(user_id):
+    """
+    The full User row behind a token, kept in-process for a short while.
+
+    Saves in this process drop the entry at once; other workers see a
+    changed or deactivated user within ``AUTH_USER_CACHE_TTL`` seconds.
+    """
+    user_id = _user_id(user_id)
+    with _lock:
+        entry = _users.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            _users.move_to_end(user_id)
+            return entry[1]
+    user = (
+        get_user_model().objects.select_related('customer')
+        .filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+    )
+    if user is not None:
+        with _lock:
+            _users[user_id] = (time.monotonic() + _user_cache_ttl(), user)
+            _users.move_to_end(user_id)
+            while len(_users) > getattr(settings, 'AUTH_USER_CACHE_SIZE', DEFAULT_USER_CACHE_SIZE):
+                _users.popitem(last=False)
+    return user
+
+
+def invalidate_user(user_id):
+    with _lock:
+        _users.pop(_user_id(user_id), None)
+    jwt_cache.invalidate_user(user_id)
+
+
+def user_claims(user):
+    """
+    What requests need to know about a user without loading it.
+    """
+    customer = getattr(user, 'customer', None)
+    staff = getattr(user, 'staff', None)
+    return {
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        # Same values as UserProfileSerializer.get_role
+        'role': 'admin' if user.is_staff or user.is_superuser else 'customer',
+        'customer_id': customer.pk if customer is not None else None,
+        'staff_id': staff.pk if staff is not None else None,
+    }
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying ``user_claims``. Access tokens copy them, and
+    each refresh re-reads the user so role changes are picked up.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in user_claims(user).items():
+            token[claim] = value
+        return token
+
+    @property
+    def access_token(self):
+        user = load_user(self.payload.get(api_settings.USER_ID_CLAIM))
+        if user is not None:
+            for claim, value in user_claims(user).items():
+                self[claim] = value
+        return super().access_token
+
+    def check_blacklist(self):
+        # Most tokens were never revoked; only ask the table when the
+        # filter can't rule it out
+        if revocation.might_be_revoked(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+def active_user(token):
+    """
+    The cached, active User row behind a token with claims, or None.
+    """
+    user = load_user(token[api_settings.USER_ID_CLAIM])
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+class ClaimsUser:
+    """
+    Request user built from access token claims.
+
+    The id and customer/staff ids come from the token. Permission flags
+    and role come from the cached User row (see ``load_user``), so
+    deactivating or demoting a user takes effect before their access
+    token expires. Anything else (names, ``save()``, related objects) is
+    read from the same row.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token, user):
+        self.id = self.pk = _user_id(token[api_settings.USER_ID_CLAIM])
+        self.is_active = user.is_active
+        self.is_staff = user.is_staff
+        self.is_superuser = user.is_superuser
+        self.role = user_claims(user)['role']
+        self.customer_id = token.get('customer_id')
+        self.staff_id = token.get('staff_id')
+
+    def get_user(self):
+        return load_user(self.pk)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        user = self.get_user()
+        if user is None:
+            raise AttributeError(name)
+        return getattr(user, name)
+
+    def __eq__(self, other):
+        return getattr(other, 'pk', None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return f'User {self.pk}'
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request user query for tokens that
+    carry claims; older tokens still load the user.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+        user = active_user(validated_token)
+        if user is None:
+            raise AuthenticationFailed(_('User not found or inactive'), code='user_inactive')
+        return ClaimsUser(validated_token, user)
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.core import checks
+
+# psycopg_pool's default when OPTIONS["pool"] is True
+DEFAULT_POOL_SIZE = 4
+
+
+def _connections_per_worker(alias, database, threads, messages):
+    pool = database.get('OPTIONS', {}).get('pool')
+    if not pool:
+        # One connection per thread, kept open between requests
+        return threads
+    if database.get('CONN_MAX_AGE'):
+        messages.append(checks.Error(
+            'CONN_MAX_AGE must be 0 when the connection pool is enabled.',
+            obj=alias,
+            id='laundry_api.E001',
+        ))
+    max_size = pool.get('max_size', DEFAULT_POOL_SIZE) if isinstance(pool, dict) else DEFAULT_POOL_SIZE
+    if max_size < threads:
+        messages.append(checks.Warning(
+            f'DB_POOL_MAX_SIZE ({max_size}) is below GUNICORN_THREADS ({threads}); '
+            f'requests will queue for a connection.',
+            obj=alias,
+            id='laundry_api.W001',
+        ))
+    return max_size
+
+
+@checks.register('database_pool')
+def check_connection_budget(app_configs, **kwargs):
+    """
+    Make sure every gunicorn worker can get a connection without the
+    workers together exceeding what the database server allows.
+
+    Each worker holds connections to the primary and to every read replica;
+    aliases pointing at the same server share its limit.
+    """
+    workers = getattr(settings, 'WEB_CONCURRENCY', 1)
+    threads = getattr(settings, 'GUNICORN_THREADS', 1)
+    limit = getattr(settings, 'DB_MAX_CONNECTIONS', None)
+    messages = []
+
+    # (host, port) -> {alias: connections per worker}
+    servers = {}
+    for alias in ['default', *getattr(settings, 'REPLICA_DATABASES', [])]:
+        database = settings.DATABASES[alias]
+        server = servers.setdefault((database.get('HOST'), database.get('PORT')), {})
+        server[alias] = _connections_per_worker(alias, database, threads, messages)
+
+    for aliases in servers.values():
+        per_worker = sum(aliases.values())
+        total = workers * per_worker
+        if limit and total > limit:
+            messages.append(checks.Error(
+                f'{workers} workers x {per_worker} connections = {total}, '
+                f'more than DB_MAX_CONNECTIONS ({limit}).',
+                hint='Lower WEB_CONCURRENCY or DB_POOL_MAX_SIZE, or raise the server limit.',
+                obj=', '.join(aliases),
+                id='laundry_api.E002',
+            ))
+    return messages
+
+
+# Backends whose entries only the current process can see
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Event sequence numbers and replay, the catalog version, token
+    revocation and token clients' replica pins are only correct if every
+    worker and the ASGI process share the default cache.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND', PROCESS_LOCAL_CACHES[0])
+    if backend in PROCESS_LOCAL_CACHES:
+        return [checks.Warning(
+            f'The default cache ({backend}) is not shared between processes.',
+            hint='Point CACHES["default"] at Redis (REDIS_CACHE_URL) when running more than one process.',
+            id='laundry_api.W002',
+        )]
+    return []
@@ -0,0 +1,138 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY_PREFIX = 'laundry_api:db:pinned:'
+PIN_COOKIE = 'replica_pin'
+DEFAULT_PIN_SECONDS = 10
+
+# Replica alias the current request reads from, None for the primary
+_read_alias = ContextVar('laundry_api_read_alias', default=None)
+
+
+def replicas():
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+def pin_seconds():
+    """
+    How long replicas may lag behind a write, as far as routing is concerned.
+    """
+    return getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+def _pin_key(user):
+    return f'{PIN_KEY_PREFIX}{user.pk}'
+
+
+def pin(request, response):
+    """
+    Send the client's reads to the primary for ``REPLICA_PIN_SECONDS``, long
+    enough for the replicas to catch up with what they just wrote.
+
+    The pin is a signed cookie, which any worker can check without a
+    lookup, and for signed-in users also an entry in the shared cache, for
+    token clients on other origins that don't send cookies.
+    """
+    seconds = pin_seconds()
+    response.set_signed_cookie(
+        PIN_COOKIE, '1', salt=PIN_COOKIE, max_age=seconds,
+        secure=request.is_secure(), httponly=True, samesite='Lax',
+    )
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user), True, seconds)
+
+
+def is_pinned(request):
+    if request.get_signed_cookie(PIN_COOKIE, default=None, salt=PIN_COOKIE, max_age=pin_seconds()):
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated and cache.get(_pin_key(user), False)
+
+
+def can_use_replica(request):
+    """
+    Safe requests go to a replica unless their client wrote something recently.
+    """
+    return bool(replicas()) and request.method in SAFE_METHODS and not is_pinned(request)
+
+
+def use_replica():
+    """
+    Route this context's reads to a replica; pass the returned token to
+    ``use_primary`` to undo it.
+    """
+    return _read_alias.set(random.choice(replicas()))
+
+
+def use_primary(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def replica_reads(request):
+    """
+    Reads inside the block go to one replica, if ``request`` may use one.
+    """
+    if not can_use_replica(request):
+        yield
+        return
+    token = use_replica()
+    try:
+        yield
+    finally:
+        use_primary(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Reads inside the block go to the primary, even within ``replica_reads``.
+    """
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_from_replica(view):
+    """
+    Decorator for function views (statistics, reports) that only read.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        with replica_reads(request):
+            return view(request, *args, **kwargs)
+    return wrapped
+
+
+class ReplicaRouter:
+    """
+    Writes, and reads outside a ``replica_reads`` block, go to the primary.
+    Inside one, reads go to that block's replica unless a transaction is
+    open on the primary, so code that just wrote in it reads the result.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,66 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+def _parse_moment(value, end_of_day=False):
+    """
+    Accept an ISO datetime or a plain date; a date used as an upper bound
+    covers the whole day.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            moment = timezone.datetime.combine(
+                day, timezone.datetime.max.time() if end_of_day else timezone.datetime.min.time()
+            )
+    except ValueError:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class QueryParamFilterBackend(BaseFilterBackend):
+    """
+    Exact-match and range filters declared on the view.
+
+    ``filter_fields`` maps query parameters to exact lookups, and
+    ``range_filter_fields`` maps a field to its ``<param>_after`` /
+    ``<param>_before`` bounds, e.g. ``?created_after=2026-01-01``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        lookups = {}
+
+        for param, lookup in getattr(view, 'filter_fields', {}).items():
+            value = params.get(param)
+            if value in (None, ''):
+                continue
+            if value == 'null':
+                lookups[f'{lookup}__isnull'] = True
+            else:
+                lookups[lookup] = value
+
+        for prefix, field in getattr(view, 'range_filter_fields', {}).items():
+            for suffix, operator in (('after', 'gte'), ('before', 'lte')):
+                param = f'{prefix}_{suffix}'
+                value = params.get(param)
+                if not value:
+                    continue
+                moment = _parse_moment(value, end_of_day=suffix == 'before')
+                if moment is None:
+                    raise ValidationError({param: 'Enter a valid date or datetime.'})
+                lookups[f'{field}__{operator}'] = moment
+
+        if not lookups:
+            return queryset
+        try:
+            return queryset.filter(**lookups)
+        except (ValueError, TypeError) as exc:
+            raise ValidationError({'detail': str(exc)})
@@ -0,0 +1,70 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+from laundry_api.models import DailyRevenue, Order, Payment
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily revenue rollup from orders and payments'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Rebuilding daily revenue rollup...')
+        buckets = defaultdict(lambda: {
+            'order_count': 0,
+            'subtotal': Decimal('0.00'),
+            'delivery_fees': Decimal('0.00'),
+            'collected': Decimal('0.00'),
+        })
+
+        with transaction.atomic():
+            orders = (
+                Order.objects.annotate(day=TruncDate('created_at'))
+                .values('day', 'service_type_id', 'delivery_type')
+                .annotate(
+                    order_count=Count('id'),
+                    subtotal_sum=Sum('subtotal'),
+                    delivery_fee_sum=Sum('delivery_fee'),
+                )
+                .order_by()
+            )
+            for row in orders:
+                bucket = buckets[(row['day'], row['service_type_id'], row['delivery_type'])]
+                bucket['order_count'] = row['order_count']
+                bucket['subtotal'] = row['subtotal_sum'] or Decimal('0.00')
+                bucket['delivery_fees'] = row['delivery_fee_sum'] or Decimal('0.00')
+
+            payments = (
+                Payment.objects.filter(status='completed')
+                .annotate(day=TruncDate('payment_date'))
+                .values('day', 'invoice__order__service_type_id', 'invoice__order__delivery_type')
+                .annotate(collected_sum=Sum('amount'))
+                .order_by()
+            )
+            for row in payments:
+                bucket = buckets[(
+                    row['day'],
+                    row['invoice__order__service_type_id'],
+                    row['invoice__order__delivery_type'],
+                )]
+                bucket['collected'] = row['collected_sum'] or Decimal('0.00')
+
+            DailyRevenue.objects.all().delete()
+            DailyRevenue.objects.bulk_create(
+                [
+                    DailyRevenue(
+                        day=day,
+                        service_type_id=service_type_id,
+                        delivery_type=delivery_type,
+                        **values,
+                    )
+                    for (day, service_type_id, delivery_type), values in buckets.items()
+                ],
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(buckets)} rollup rows'))
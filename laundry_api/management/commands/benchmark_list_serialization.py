@@ -0,0 +1,112 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from laundry_api.models import (
+    Customer, GarmentType, ServiceType,
+    Order, OrderItem, Invoice, Payment
+)
+from laundry_api.serializers import OrderSerializer, PaymentSerializer
+from laundry_api.utils.fast_list import get_values_renderer
+from laundry_api.utils.query_plan import optimize_queryset
+
+
+class Command(BaseCommand):
+    help = 'Compares serializer and .values() list rendering on generated rows (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Number of orders/payments to generate')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+
+        with transaction.atomic():
+            self.stdout.write(f'Generating {rows} orders and payments...')
+            self.generate(rows)
+
+            for serializer_class, queryset in [
+                (OrderSerializer, Order.objects.order_by('-created_at', '-id')),
+                (PaymentSerializer, Payment.objects.order_by('-payment_date', '-id')),
+            ]:
+                self.compare(serializer_class, queryset)
+
+            # Leave the database as we found it
+            transaction.set_rollback(True)
+
+    def generate(self, rows):
+        garment, _ = GarmentType.objects.get_or_create(
+            name='native_wear', defaults={'base_price': Decimal('1500.00')}
+        )
+        service, _ = ServiceType.objects.get_or_create(
+            name='regular', defaults={'price_multiplier': Decimal('1.0')}
+        )
+        customer = Customer.objects.create(
+            name='Benchmark Customer',
+            email=f'benchmark.{timezone.now().timestamp()}@laundry.com',
+            phone='08000000000',
+            address='Benchmark'
+        )
+
+        orders = Order.objects.bulk_create([
+            Order(
+                customer=customer,
+                order_number=f'BENCH{i:09d}',
+                service_type=service,
+                delivery_type='pickup' if i % 2 else 'byself',
+                subtotal=Decimal('3000.00'),
+                delivery_fee=Decimal('500.00') if i % 2 else Decimal('0.00'),
+                total_amount=Decimal('3500.00') if i % 2 else Decimal('3000.00'),
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                garment_type=garment,
+                quantity=2,
+                unit_price=Decimal('1500.00'),
+                total_price=Decimal('3000.00'),
+            )
+            for order in orders
+        ], batch_size=1000)
+        invoices = Invoice.objects.bulk_create([
+            Invoice(
+                order=order,
+                invoice_number=f'BINV{i:09d}',
+                due_date=timezone.localdate(),
+                balance_due=order.total_amount,
+            )
+            for i, order in enumerate(orders)
+        ], batch_size=1000)
+        Payment.objects.bulk_create([
+            Payment(
+                invoice=invoice,
+                amount=Decimal('1000.00'),
+                payment_method='cash',
+                status='pending',
+            )
+            for invoice in invoices
+        ], batch_size=1000)
+
+    def compare(self, serializer_class, queryset):
+        name = serializer_class.__name__
+
+        start = time.perf_counter()
+        serialized = serializer_class(optimize_queryset(queryset, serializer_class), many=True).data
+        serializer_seconds = time.perf_counter() - start
+
+        renderer = get_values_renderer(serializer_class)
+        start = time.perf_counter()
+        rendered = renderer.render(renderer.values(queryset))
+        values_seconds = time.perf_counter() - start
+
+        identical = JSONRenderer().render(serialized) == JSONRenderer().render(rendered)
+        style = self.style.SUCCESS if identical else self.style.ERROR
+        self.stdout.write(style(
+            f'{name}: serializer {serializer_seconds:.3f}s, values {values_seconds:.3f}s '
+            f'({serializer_seconds / max(values_seconds, 1e-9):.1f}x), identical output: {identical}'
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from laundry_api.utils import revocation
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired outstanding and blacklisted tokens in batches, then rebuilds the revoked-token filter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tokens deleted per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count expired tokens')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # Oldest first: expired rows sit at the low ids, so each batch
+        # finds them without scanning the whole table
+        expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by('id')
+
+        if options['dry_run']:
+            self.stdout.write(f'{expired.count()} expired tokens would be deleted')
+            return
+
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                ids = list(expired.values_list('id', flat=True)[:options['batch_size']])
+                if not ids:
+                    break
+                # Delete the blacklist rows directly so the cascade doesn't
+                # load them one by one
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+
+        revocation.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired tokens; revoked-token filter rebuilt'))
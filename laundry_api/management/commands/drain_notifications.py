@@ -0,0 +1,106 @@
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from laundry_api.models import NotificationOutbox
+from laundry_api.utils.notifications import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Sends queued SMS from the notification outbox, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain what is due and exit instead of polling')
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages claimed per round')
+        parser.add_argument('--concurrency', type=int, default=8, help='Messages in flight at once')
+        parser.add_argument('--max-attempts', type=int, default=5, help='Attempts before a message is marked failed')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when nothing is due')
+        parser.add_argument('--lease', type=int, default=60, help='Seconds a claimed message is hidden from other workers')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.backend = get_backend(concurrency=options['concurrency'])
+        sent = failed = 0
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            while True:
+                close_old_connections()
+                batch = self.claim()
+                if batch:
+                    batch_sent, batch_failed = self.deliver(pool, batch)
+                    sent += batch_sent
+                    failed += batch_failed
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} messages, {failed} failed attempts'))
+
+    def claim(self):
+        """
+        Lease the next due messages by pushing their next attempt past the
+        lease, so a worker that dies mid-send releases them automatically.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                NotificationOutbox.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:self.options['batch_size']]
+            )
+            if batch:
+                NotificationOutbox.objects.filter(id__in=[message.id for message in batch]).update(
+                    next_attempt_at=now + timedelta(seconds=self.options['lease'])
+                )
+        return batch
+
+    def deliver(self, pool, batch):
+        # The same text to the same phone in one round goes out once
+        groups = defaultdict(list)
+        for message in batch:
+            groups[(message.recipient, message.body)].append(message)
+
+        errors = dict(zip(groups, pool.map(self.send, groups)))
+
+        now = timezone.now()
+        delivered = []
+        retries = []
+        for key, messages in groups.items():
+            if errors[key] is None:
+                delivered.extend(messages)
+            else:
+                retries.extend((message, errors[key]) for message in messages)
+
+        if delivered:
+            NotificationOutbox.objects.filter(id__in=[message.id for message in delivered]).update(
+                status='sent', sent_at=now, last_error=''
+            )
+        for message, error in retries:
+            message.attempts += 1
+            message.last_error = error
+            if message.attempts >= self.options['max_attempts']:
+                message.status = 'failed'
+            else:
+                message.next_attempt_at = now + self.backoff(message.attempts)
+            message.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+        return len(delivered), len(retries)
+
+    def send(self, key):
+        try:
+            self.backend.send(*key)
+        except Exception as exc:
+            return str(exc) or exc.__class__.__name__
+        return None
+
+    def backoff(self, attempts):
+        # 10s, 20s, 40s... capped at an hour, with jitter so retries spread out
+        delay = min(10 * 2 ** (attempts - 1), 3600)
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
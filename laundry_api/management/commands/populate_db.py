@@ -8,6 +8,7 @@ from decimal import Decimal
 import random
 from datetime import timedelta
 from django.utils import timezone
+from laundry_api.utils.pricing import PriceCatalog, create_priced_order
 
 class Command(BaseCommand):
     help = 'Populates the database with sample data'
@@ -138,6 +139,9 @@ class Command(BaseCommand):
         order_statuses = ['pending', 'processing', 'ready', 'delivered', 'delivered']
         delivery_types = ['pickup', 'byself']
         
+        # Load prices once and reuse them for every order in the batch
+        catalog = PriceCatalog.load()
+
         orders = []
         for i in range(20):
             # Random date in the last 30 days
@@ -149,7 +153,17 @@ class Command(BaseCommand):
             delivery_type = random.choice(delivery_types)
             status = random.choice(order_statuses)
             
-            order = Order.objects.create(
+            # Add 1-4 random items to each order
+            num_items = random.randint(1, 4)
+            selected_garments = random.sample(garment_types, num_items)
+            items_data = [
+                {'garment_type': garment, 'quantity': random.randint(1, 5)}
+                for garment in selected_garments
+            ]
+            
+            order = create_priced_order(
+                items_data,
+                catalog=catalog,
                 customer=customer,
                 service_type=service_type,
                 delivery_type=delivery_type,
@@ -165,19 +179,7 @@ class Command(BaseCommand):
             
             # Set the created_at date
             order.created_at = created_date
-            order.save()
-            
-            # Add 1-4 random items to each order
-            num_items = random.randint(1, 4)
-            selected_garments = random.sample(garment_types, num_items)
-            
-            for garment in selected_garments:
-                quantity = random.randint(1, 5)
-                OrderItem.objects.create(
-                    order=order,
-                    garment_type=garment,
-                    quantity=quantity
-                )
+            order.save(update_fields=['created_at'])
             
             orders.append(order)
         
@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from laundry_api.models import Invoice
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds invoice balances from completed payment rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report invoices whose ledger disagrees with their payments',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.stdout.write('Reconciling invoice balances...')
+
+        invoices = Invoice.objects.select_related('order').annotate(
+            completed_total=Coalesce(
+                Sum('payments__amount', filter=Q(payments__status='completed')),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+        ).order_by('pk')
+
+        mismatched = []
+        for invoice in invoices.iterator(chunk_size=1000):
+            payment_status, balance_due = Invoice.payment_state(
+                invoice.order.total_amount, invoice.completed_total
+            )
+            if (
+                invoice.amount_paid != invoice.completed_total
+                or invoice.balance_due != balance_due
+                or invoice.payment_status != payment_status
+            ):
+                self.stdout.write(self.style.WARNING(
+                    f'{invoice.invoice_number}: recorded {invoice.amount_paid}, '
+                    f'payments total {invoice.completed_total}'
+                ))
+                mismatched.append(invoice.pk)
+
+        if not dry_run:
+            for pk in mismatched:
+                # Re-read under lock so payments posted meanwhile are counted
+                with transaction.atomic():
+                    Invoice.objects.select_for_update(of=('self',)).select_related(
+                        'order'
+                    ).get(pk=pk).update_payment_status()
+
+        action = 'Found' if dry_run else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{action} {len(mismatched)} mismatched invoices'))
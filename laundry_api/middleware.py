@@ -0,0 +1,22 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from . import db_router
+
+
+class ReplicaPinMiddleware:
+    """
+    After a successful write, keeps the client's reads on the primary for a
+    short while (see ``laundry_api.db_router.pin``).
+
+    DRF copies the authenticated user onto the Django request, so JWT
+    requests are pinned as well as admin sessions.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and db_router.replicas():
+            db_router.pin(request, response)
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    DocumentSequence = apps.get_model('laundry_api', 'DocumentSequence')
+    for name in ('ORD', 'INV', 'RCT'):
+        DocumentSequence.objects.get_or_create(name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laundry_api', '0004_remove_order_assigned_staff_order_assigned_ironer_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=10, unique=True)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 10:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laundry_api', '0005_documentsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('delivery_type', models.CharField(choices=[('pickup', 'Pickup'), ('byself', 'By Self')], max_length=10)),
+                ('order_count', models.IntegerField(default=0)),
+                ('subtotal', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('delivery_fees', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('collected', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('service_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenue', to='laundry_api.servicetype')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'service_type', 'delivery_type'), name='unique_daily_revenue_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0 on 2026-10-17 11:58
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Copies of laundry_api.utils.customer_search as of this migration
+def normalize_phone(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    if digits.startswith('234') and len(digits) == 13:
+        digits = '0' + digits[3:]
+    return digits
+
+
+def tokens_for(customer):
+    tokens = {word for word in re.split(r'[^\w]+', (customer.name or '').lower()) if word}
+    email = (customer.email or '').lower()
+    if email:
+        tokens.add(email[:100])
+        tokens.add(email.split('@')[0][:100])
+    return {token[:100] for token in tokens}
+
+
+def build_search_index(apps, schema_editor):
+    Customer = apps.get_model('laundry_api', 'Customer')
+    CustomerSearchToken = apps.get_model('laundry_api', 'CustomerSearchToken')
+
+    for customer in Customer.objects.iterator(chunk_size=1000):
+        customer.phone_digits = normalize_phone(customer.phone)
+        customer.save(update_fields=['phone_digits'])
+        CustomerSearchToken.objects.bulk_create(
+            CustomerSearchToken(customer=customer, token=token) for token in tokens_for(customer)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laundry_api', '0008_order_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_digits',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.CreateModel(
+            name='CustomerSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(db_index=True, max_length=100)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='laundry_api.customer')),
+            ],
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-17 13:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Case-normalized lookups for the registration availability checks.
+    auth_user belongs to django.contrib.auth, so the expression indexes are
+    created with SQL that both SQLite and PostgreSQL accept.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('laundry_api', '0010_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS auth_user_username_lower_idx ON auth_user (LOWER(username))',
+            'DROP INDEX IF EXISTS auth_user_username_lower_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS auth_user_email_lower_idx ON auth_user (LOWER(email))',
+            'DROP INDEX IF EXISTS auth_user_email_lower_idx',
+        ),
+    ]
@@ -1,8 +1,24 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Sum
 from django.contrib.auth.models import User
 from django.utils import timezone
 from decimal import Decimal
 
+from .utils import events
+from .utils.catalog import unit_price as catalog_unit_price
+from .utils.customer_search import normalize_phone, tokens_for
+from .utils.numbering import next_document_number
+from .utils.pricing import delivery_fee_for
+from .utils.rollups import order_contribution, record_order_change, record_payment_change
+
+class DocumentSequence(models.Model):
+    """Counter row backing order, invoice and receipt numbers"""
+    name = models.CharField(max_length=10, unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.name} ({self.last_value})"
+
 class Customer(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
     name = models.CharField(max_length=200)
@@ -10,10 +26,44 @@ class Customer(models.Model):
     phone = models.CharField(max_length=20)
     address = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    phone_digits = models.CharField(max_length=20, blank=True, editable=False, db_index=True)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_search_key = (instance.__dict__.get('name'), instance.__dict__.get('email'))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        self.phone_digits = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'phone_digits'}
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Rebuild search tokens only when the indexed text changed
+            if getattr(self, '_loaded_search_key', None) != (self.name, self.email):
+                self.rebuild_search_tokens()
+    
+    def rebuild_search_tokens(self):
+        CustomerSearchToken.objects.filter(customer=self).delete()
+        CustomerSearchToken.objects.bulk_create(
+            CustomerSearchToken(customer=self, token=token) for token in tokens_for(self)
+        )
+        self._loaded_search_key = (self.name, self.email)
     
     def __str__(self):
         return self.name
 
+class CustomerSearchToken(models.Model):
+    """Lower-cased name/email token used for counter lookups"""
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=100, db_index=True)
+    
+    def __str__(self):
+        return self.token
+
 class Staff(models.Model):
     ROLE_CHOICES = [
         ('washer', 'Washer'),
@@ -75,6 +125,15 @@ class Order(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
+    # Statuses each status may move to; delivered and cancelled are final
+    STATUS_TRANSITIONS = {
+        'pending': {'processing', 'cancelled'},
+        'processing': {'pending', 'ready', 'cancelled'},
+        'ready': {'processing', 'delivered', 'cancelled'},
+        'delivered': set(),
+        'cancelled': set(),
+    }
+    
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
     order_number = models.CharField(max_length=20, unique=True, editable=False)
     service_type = models.ForeignKey(ServiceType, on_delete=models.PROTECT)
@@ -102,14 +161,50 @@ class Order(models.Model):
         related_name="ironing_orders"
     )
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='order_created_at_id_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='order_status_created_idx'),
+            models.Index(fields=['customer', '-created_at', '-id'], name='order_customer_created_idx'),
+            models.Index(fields=['delivery_type', '-created_at', '-id'], name='order_delivery_created_idx'),
+            models.Index(fields=['assigned_washer', 'status'], name='order_washer_status_idx'),
+            models.Index(fields=['assigned_ironer', 'status'], name='order_ironer_status_idx'),
+        ]
+    
+    ROLLUP_FIELDS = {'created_at', 'service_type', 'service_type_id', 'delivery_type', 'subtotal', 'delivery_fee'}
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & cls.ROLLUP_FIELDS:
+            instance._loaded_rollup = order_contribution(instance)
+        return instance
+    
     def save(self, *args, **kwargs):
         if not self.order_number:
-            self.order_number = f"ORD{timezone.now().strftime('%Y%m%d%H%M%S')}"
-        super().save(*args, **kwargs)
+            self.order_number = next_document_number('ORD')
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not self.ROLLUP_FIELDS & set(update_fields):
+            super().save(*args, **kwargs)
+            return
+        
+        if self._state.adding:
+            old_rollup = None
+        elif hasattr(self, '_loaded_rollup'):
+            old_rollup = self._loaded_rollup
+        else:
+            old_rollup = order_contribution(Order.objects.get(pk=self.pk))
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Keep the daily revenue rollup in step with this order
+            self._loaded_rollup = order_contribution(self)
+            record_order_change(old_rollup, self._loaded_rollup)
     
     def calculate_total(self):
         self.subtotal = sum(item.total_price for item in self.items.all())
-        self.delivery_fee = Decimal('500.00') if self.delivery_type == 'pickup' else Decimal('0.00')
+        self.delivery_fee = delivery_fee_for(self.delivery_type)
         self.total_amount = self.subtotal + self.delivery_fee
         self.save()
     
@@ -124,9 +219,7 @@ class OrderItem(models.Model):
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     
     def save(self, *args, **kwargs):
-        base_price = self.garment_type.base_price
-        service_multiplier = self.order.service_type.price_multiplier
-        self.unit_price = base_price * service_multiplier
+        self.unit_price = catalog_unit_price(self.garment_type_id, self.order.service_type_id)
         self.total_price = self.unit_price * self.quantity
         super().save(*args, **kwargs)
         self.order.calculate_total()
@@ -149,9 +242,14 @@ class Invoice(models.Model):
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     balance_due = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-issued_date', '-id'], name='invoice_issued_date_id_idx'),
+        ]
+    
     def save(self, *args, **kwargs):
         if not self.invoice_number:
-            self.invoice_number = f"INV{timezone.now().strftime('%Y%m%d%H%M%S')}"
+            self.invoice_number = next_document_number('INV')
         if not self.due_date:
             self.due_date = (timezone.now() + timezone.timedelta(days=7)).date()
         # Initialize balance_due on first save
@@ -159,28 +257,58 @@ class Invoice(models.Model):
             self.balance_due = self.order.total_amount
         super().save(*args, **kwargs)
     
+    @staticmethod
+    def payment_state(total_amount, amount_paid):
+        """Return (payment_status, balance_due) for a paid amount"""
+        if amount_paid == 0:
+            return 'unpaid', total_amount - amount_paid
+        if amount_paid >= total_amount:
+            return 'paid', Decimal('0.00')
+        return 'partial', total_amount - amount_paid
+    
     def update_payment_status(self):
-        """Update payment status based on completed payments"""
+        """Rebuild payment status from the completed payment rows"""
         total_amount = self.order.total_amount
-        self.amount_paid = sum(
-            payment.amount for payment in self.payments.filter(status='completed')
-        )
-        self.balance_due = total_amount - self.amount_paid
+        self.amount_paid = self.payments.filter(status='completed').aggregate(
+            total=Sum('amount')
+        )['total'] or Decimal('0.00')
+        self.payment_status, self.balance_due = self.payment_state(total_amount, self.amount_paid)
         
-        if self.amount_paid == 0:
-            self.payment_status = 'unpaid'
-        elif self.amount_paid >= total_amount:
-            self.payment_status = 'paid'
-            self.balance_due = Decimal('0.00')
-        else:
-            self.payment_status = 'partial'
+        self.save(update_fields=['amount_paid', 'balance_due', 'payment_status'])
+    
+    @classmethod
+    def apply_payment_delta(cls, invoice_id, delta):
+        """
+        Add ``delta`` to an invoice's paid amount.
         
-        self.save()
+        The invoice row is locked while the new balance and status are
+        worked out, so concurrent payments on the same invoice never
+        overwrite each other.
+        """
+        if not delta:
+            return
+        with transaction.atomic():
+            amount_paid, total_amount = (
+                cls.objects.select_for_update(of=('self',))
+                .values_list('amount_paid', 'order__total_amount')
+                .get(pk=invoice_id)
+            )
+            payment_status, balance_due = cls.payment_state(total_amount, amount_paid + delta)
+            cls.objects.filter(pk=invoice_id).update(
+                amount_paid=F('amount_paid') + delta,
+                balance_due=balance_due,
+                payment_status=payment_status,
+            )
     
     def __str__(self):
         return f"{self.invoice_number} - {self.order.order_number}"
 
 class Payment(models.Model):
+    """
+    ``save()`` and ``delete()`` keep the invoice ledger and the revenue
+    rollup in step. Queryset ``update()``/``delete()`` bypass both; run
+    ``Invoice.update_payment_status()`` on the affected invoices afterwards.
+    """
     PAYMENT_METHOD_CHOICES = [
         ('cash', 'Cash'),
         ('card', 'Card'),
@@ -201,23 +329,89 @@ class Payment(models.Model):
     payment_date = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-payment_date', '-id'], name='payment_date_id_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_ledger_state()
+        return instance
+    
+    LEDGER_FIELDS = ('invoice_id', 'status', 'amount', 'payment_date')
+    
+    def _remember_ledger_state(self, values=None):
+        # What this payment currently contributes to its invoice's ledger
+        values = values if values is not None else self.__dict__
+        if any(name not in values for name in self.LEDGER_FIELDS):
+            return
+        self._loaded_invoice_id = values['invoice_id']
+        self._loaded_status = values['status']
+        self._loaded_amount = values['amount']
+        self._loaded_payment_date = values['payment_date']
+    
+    def _ledger_contribution(self):
+        return self.amount if self.status == 'completed' else Decimal('0.00')
+    
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        old_status = None
+        is_new = self._state.adding
         
-        if not is_new:
-            old_payment = Payment.objects.get(pk=self.pk)
-            old_status = old_payment.status
+        with transaction.atomic():
+            if not is_new:
+                # Work from the stored row, locked, so two requests
+                # completing the same payment can't both add it
+                stored = Payment.objects.select_for_update().values(*self.LEDGER_FIELDS).filter(pk=self.pk).first()
+                if stored is not None:
+                    self._remember_ledger_state(stored)
+            old_invoice_id = getattr(self, '_loaded_invoice_id', None)
+            old_status = getattr(self, '_loaded_status', None)
+            old_amount = getattr(self, '_loaded_amount', None)
+            old_payment_date = getattr(self, '_loaded_payment_date', None)
+            
+            super().save(*args, **kwargs)
+            
+            # Apply the change in contribution to the invoice ledger
+            old_contribution = old_amount if old_status == 'completed' else Decimal('0.00')
+            new_contribution = Decimal(self._ledger_contribution())
+            if old_invoice_id is not None and old_invoice_id != self.invoice_id:
+                Invoice.apply_payment_delta(old_invoice_id, -old_contribution)
+                Invoice.apply_payment_delta(self.invoice_id, new_contribution)
+            else:
+                Invoice.apply_payment_delta(self.invoice_id, new_contribution - old_contribution)
+            
+            record_payment_change(
+                old_invoice_id, old_payment_date, old_contribution,
+                self.invoice_id, self.payment_date, new_contribution,
+            )
+            
+            # Auto-generate receipt when payment is completed
+            if self.status == 'completed' and old_status != 'completed':
+                if is_new or not hasattr(self, 'receipt'):
+                    Receipt.objects.create(payment=self)
+                events.publish(
+                    events.PAYMENT_COMPLETED, ('payment', self.pk),
+                    payment_id=self.pk,
+                    invoice_id=self.invoice_id,
+                    amount=str(self.amount),
+                    payment_method=self.payment_method,
+                )
         
-        super().save(*args, **kwargs)
-        
-        # Update invoice payment status after saving
-        self.invoice.update_payment_status()
-        
-        # Auto-generate receipt when payment is completed
-        if self.status == 'completed' and old_status != 'completed':
-            if not hasattr(self, 'receipt'):
-                Receipt.objects.create(payment=self)
+        self._remember_ledger_state()
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            stored = Payment.objects.select_for_update().values(*self.LEDGER_FIELDS).filter(pk=self.pk).first()
+            if stored is None:
+                return super().delete(*args, **kwargs)
+            old_status = stored['status']
+            old_amount = stored['amount']
+            invoice_id = stored['invoice_id']
+            result = super().delete(*args, **kwargs)
+            if old_status == 'completed':
+                Invoice.apply_payment_delta(invoice_id, -old_amount)
+        return result
     
     def __str__(self):
         return f"Payment for {self.invoice.invoice_number} - ₦{self.amount}"
@@ -227,14 +421,40 @@ class Receipt(models.Model):
     receipt_number = models.CharField(max_length=20, unique=True, editable=False)
     generated_date = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-generated_date', '-id'], name='receipt_generated_date_id_idx'),
+        ]
+    
     def save(self, *args, **kwargs):
         if not self.receipt_number:
-            self.receipt_number = f"RCT{timezone.now().strftime('%Y%m%d%H%M%S')}"
+            self.receipt_number = next_document_number('RCT')
         super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.receipt_number} - {self.payment.invoice.invoice_number}"
 
+class DailyRevenue(models.Model):
+    """Per-day order and payment totals, kept up to date incrementally"""
+    day = models.DateField()
+    service_type = models.ForeignKey(ServiceType, on_delete=models.CASCADE, related_name='daily_revenue')
+    delivery_type = models.CharField(max_length=10, choices=Order.DELIVERY_CHOICES)
+    order_count = models.IntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    delivery_fees = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    collected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'service_type', 'delivery_type'],
+                name='unique_daily_revenue_bucket',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.service_type} {self.delivery_type}"
+
 class Feedback(models.Model):
     RATING_CHOICES = [(i, str(i)) for i in range(1, 6)]
     
@@ -244,5 +464,36 @@ class Feedback(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='feedback_created_at_id_idx'),
+        ]
+    
     def __str__(self):
         return f"Feedback from {self.customer.name} - {self.rating} stars"
+
+class NotificationOutbox(models.Model):
+    """SMS waiting to be sent by the drain_notifications worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    dedup_key = models.CharField(max_length=100, unique=True)
+    recipient = models.CharField(max_length=20)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.recipient} ({self.status})"
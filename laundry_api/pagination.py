@@ -0,0 +1,27 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a ``(timestamp, id)`` ordering backed by a
+    matching composite index, so deep pages cost the same as the first.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class CreatedAtPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class IssuedDatePagination(KeysetPagination):
+    ordering = ('-issued_date', '-id')
+
+
+class PaymentDatePagination(KeysetPagination):
+    ordering = ('-payment_date', '-id')
+
+
+class GeneratedDatePagination(KeysetPagination):
+    ordering = ('-generated_date', '-id')
@@ -4,8 +4,64 @@ from .models import (
     Order, OrderItem, Invoice, Payment, Feedback, User, Receipt
 )
 from django.contrib.auth import authenticate
+from django.db import transaction
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .authentication import ClaimsRefreshToken
+from .utils import availability
+from .utils.pricing import create_priced_order
+
+
+def _split_param(value):
+    return frozenset(name.strip() for name in value.split(',') if name.strip())
+
+
+class DynamicFieldsMixin:
+    """
+    Lets clients trim read responses with ``?fields=a,b`` and pull in
+    nested data with ``?expand=items``.
+
+    Fields listed in ``Meta.expandable_fields`` are only rendered when
+    expanded (or named in ``fields``) once either parameter is given;
+    without parameters the full representation is returned. Only the
+    top-level serializer of a read request is trimmed.
+    """
+
+    @property
+    def field_selection(self):
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return None
+        root = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if root is not None:
+            return None
+        fields = request.query_params.get('fields')
+        expand = request.query_params.get('expand')
+        if fields is None and expand is None:
+            return None
+        return (
+            _split_param(fields) if fields is not None else None,
+            _split_param(expand or ''),
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.field_selection
+        if selection is None:
+            return fields
+
+        wanted, expand = selection
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        for name in list(fields):
+            if name in expandable:
+                keep = name in expand or (wanted is not None and name in wanted)
+            else:
+                keep = wanted is None or name in wanted
+            if not keep:
+                fields.pop(name)
+        return fields
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -22,6 +78,17 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ['username', 'email', 'password', 'password2', 'first_name', 'last_name', 'role', 'phone', 'address']
     
+    def validate_username(self, value):
+        # Same case rules as the check-username endpoint
+        if availability.exists('username', value):
+            raise serializers.ValidationError("A user with that username already exists.")
+        return value
+
+    def validate_email(self, value):
+        if availability.exists('email', value):
+            raise serializers.ValidationError("A user with that email already exists.")
+        return value
+
     def validate(self, attrs):
         if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({"password": "Passwords don't match"})
@@ -59,6 +126,8 @@ class RegisterSerializer(serializers.ModelSerializer):
                 address=address
             )
         
+        # The availability checks see the new account right away
+        transaction.on_commit(lambda: availability.mark_taken(username=user.username, email=user.email))
         return user
 
 class LoginSerializer(serializers.Serializer):
@@ -81,6 +150,9 @@ class LoginSerializer(serializers.Serializer):
         attrs['user'] = user
         return attrs
 
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
 class UserProfileSerializer(serializers.ModelSerializer):
     role = serializers.SerializerMethodField()
     profile = serializers.SerializerMethodField()
@@ -107,7 +179,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
 class CustomerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Customer
-        fields = '__all__'
+        exclude = ['phone_digits']
 
 class StaffSerializer(serializers.ModelSerializer):
     class Meta:
@@ -138,8 +210,9 @@ class OrderItemSerializer(serializers.ModelSerializer):
         model = OrderItem
         fields = ['id', 'garment_type', 'garment_name', 'quantity', 'unit_price', 'total_price']
         read_only_fields = ['unit_price', 'total_price']
+        select_related = ['garment_type']
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, required=False)
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     service_name = serializers.CharField(source='service_type.get_name_display', read_only=True)
@@ -158,17 +231,19 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = '__all__'
         read_only_fields = ['order_number', 'subtotal', 'total_amount', 'delivery_fee']
+        select_related = ['customer', 'service_type', 'assigned_washer', 'assigned_ironer']
+        expandable_fields = ['items']
     
     def create(self, validated_data):
         items_data = validated_data.pop('items', [])
-        order = Order.objects.create(**validated_data)
-        
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
-        
-        # Auto-generate invoice
-        Invoice.objects.create(order=order)
-        
+
+        with transaction.atomic():
+            # Prices the whole cart in one pass and bulk-inserts the items
+            order = create_priced_order(items_data, **validated_data)
+
+            # Auto-generate invoice
+            Invoice.objects.create(order=order)
+
         return order
     
 
@@ -177,7 +252,17 @@ class OrderStatusUpdateSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['status']
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class BulkOrderStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500
+    )
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+    def validate_ids(self, value):
+        # Keep the caller's order but drop repeats
+        return list(dict.fromkeys(value))
+
+class InvoiceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     order_details = OrderSerializer(source='order', read_only=True)
     customer_name = serializers.CharField(source='order.customer.name', read_only=True)
     total_amount = serializers.DecimalField(source='order.total_amount', max_digits=10, decimal_places=2, read_only=True)
@@ -186,8 +271,10 @@ class InvoiceSerializer(serializers.ModelSerializer):
         model = Invoice
         fields = '__all__'
         read_only_fields = ['invoice_number', 'issued_date', 'payment_status', 'amount_paid', 'balance_due']
+        select_related = ['order__customer']
+        expandable_fields = ['order_details']
 
-class ReceiptSerializer(serializers.ModelSerializer):
+class ReceiptSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     payment_details = serializers.SerializerMethodField()
     invoice_details = serializers.SerializerMethodField()
     
@@ -195,6 +282,7 @@ class ReceiptSerializer(serializers.ModelSerializer):
         model = Receipt
         fields = '__all__'
         read_only_fields = ['receipt_number', 'generated_date']
+        select_related = ['payment__invoice__order__customer']
     
     def get_payment_details(self, obj):
         return {
@@ -217,13 +305,16 @@ class ReceiptSerializer(serializers.ModelSerializer):
             'payment_status': invoice.get_payment_status_display(),
         }
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True)
     has_receipt = serializers.SerializerMethodField()
     
     class Meta:
         model = Payment
         fields = '__all__'
+        select_related = ['invoice', 'receipt']
+        # Read by the .values() list path in place of get_has_receipt
+        values_fields = {'has_receipt': ('receipt', lambda receipt_id: receipt_id is not None)}
     
     def get_has_receipt(self, obj):
         return hasattr(obj, 'receipt')
@@ -245,10 +336,11 @@ class PaymentStatusUpdateSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['status']
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     order_number = serializers.CharField(source='order.order_number', read_only=True)
     
     class Meta:
         model = Feedback
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        select_related = ['customer', 'order']
\ No newline at end of file
@@ -0,0 +1,80 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import invalidate_user
+from .models import Customer, Feedback, GarmentType, Order, Payment, ServiceType
+from .utils import catalog, revocation, rollups, statistics
+
+
+@receiver(post_save, sender=GarmentType)
+@receiver(post_delete, sender=GarmentType)
+@receiver(post_save, sender=ServiceType)
+@receiver(post_delete, sender=ServiceType)
+def invalidate_price_catalog(sender, **kwargs):
+    # Wait for the commit so other workers can't reload the old rows
+    transaction.on_commit(catalog.invalidate)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_statistics(sender, **kwargs):
+    transaction.on_commit(lambda: statistics.invalidate(statistics.ORDERS))
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def invalidate_payment_statistics(sender, **kwargs):
+    transaction.on_commit(lambda: statistics.invalidate(statistics.PAYMENTS))
+
+
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+def invalidate_feedback_statistics(sender, **kwargs):
+    transaction.on_commit(lambda: statistics.invalidate(statistics.FEEDBACKS))
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_from_rollup(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_rollup', None) or rollups.order_contribution(instance)
+    rollups.record_order_change(loaded, None)
+
+
+@receiver(post_delete, sender=Payment)
+def remove_payment_from_rollup(sender, instance, **kwargs):
+    if getattr(instance, '_loaded_status', instance.status) != 'completed':
+        return
+    rollups.record_payment_change(
+        getattr(instance, '_loaded_invoice_id', instance.invoice_id),
+        getattr(instance, '_loaded_payment_date', instance.payment_date),
+        getattr(instance, '_loaded_amount', instance.amount),
+        None, None, rollups.ZERO,
+    )
+
+
+@receiver(user_logged_out)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, user=None, instance=None, **kwargs):
+    user = user or instance
+    if user is not None and user.pk is not None:
+        invalidate_user(user.pk)
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_cached_customer_user(sender, instance, **kwargs):
+    if instance.user_id is not None:
+        invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def record_revoked_token(sender, instance, created, **kwargs):
+    if created:
+        jti = instance.token.jti
+        revocation.mark_pending(jti)
+        transaction.on_commit(lambda: revocation.record_revoked(jti))
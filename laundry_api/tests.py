@@ -1,3 +1,394 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import db_router
+from .authentication import ClaimsRefreshToken
+from .filters import QueryParamFilterBackend
+from .models import Customer, Feedback, GarmentType, Invoice, NotificationOutbox, Order, Payment, ServiceType
+from .utils import catalog, last_login, revocation, statistics
+from .utils.pricing import create_priced_order
+
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class QueryCountMixin:
+    """
+    TestCase mixin for checking that list endpoints don't issue per-row
+    queries.
+    """
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assertConstantListQueries(self, url, create_row, sizes=(1, 10)):
+        """
+        Grow the table behind ``url`` with ``create_row`` and assert the
+        list response costs the same number of queries at every size.
+        """
+        rows = 0
+        counts = []
+        for size in sizes:
+            while rows < size:
+                create_row()
+                rows += 1
+            counts.append(self.count_queries(url))
+        self.assertEqual(
+            len(set(counts)), 1,
+            f"{url} query count grew with rows: {dict(zip(sizes, counts))}"
+        )
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class OrderTestCase(TestCase):
+    """
+    TestCase with a priced catalog entry and a customer to order for.
+    """
+
+    def setUp(self):
+        catalog.clear_local()
+        self.garment = GarmentType.objects.create(name='agbada', base_price=Decimal('2500'))
+        self.service = ServiceType.objects.create(name='express', price_multiplier=Decimal('2.0'))
+        self.customer = Customer.objects.create(name='Ada', email='ada@example.com', phone='0801', address='Lagos')
+
+    def create_order(self, status=None, quantity=1):
+        order = create_priced_order(
+            [{'garment_type': self.garment, 'quantity': quantity}],
+            customer=self.customer,
+            service_type=self.service,
+            delivery_type='pickup',
+        )
+        if status is not None:
+            Order.objects.filter(pk=order.pk).update(status=status)
+        return order
+
+
+class ListQueryCountTests(QueryCountMixin, OrderTestCase):
+
+    def create_row(self):
+        order = self.create_order(quantity=2)
+        invoice = Invoice.objects.create(order=order)
+        # Completed payments also generate a receipt
+        Payment.objects.create(invoice=invoice, amount=Decimal('100'), payment_method='cash', status='completed')
+        Feedback.objects.create(customer=self.customer, order=order, rating=5, comment='Clean')
+
+    def test_orders(self):
+        self.assertConstantListQueries('/api/orders/', self.create_row)
+
+    def test_orders_with_fields(self):
+        self.assertConstantListQueries('/api/orders/?fields=order_number,customer', self.create_row)
+
+    def test_trimmed_page_keeps_cursor_columns(self):
+        # The next-page cursor reads created_at from the page's rows
+        for _ in range(10):
+            self.create_row()
+        self.assertEqual(
+            self.count_queries('/api/orders/?fields=order_number&page_size=3'),
+            self.count_queries('/api/orders/?fields=order_number,created_at&page_size=3'),
+        )
+
+    def test_invoices(self):
+        self.assertConstantListQueries('/api/invoices/', self.create_row)
+
+    def test_payments(self):
+        self.assertConstantListQueries('/api/payments/', self.create_row)
+
+    def test_payments_with_fields(self):
+        for fields in ('has_receipt', 'id,has_receipt,invoice_number'):
+            with self.subTest(fields):
+                self.assertConstantListQueries(f'/api/payments/?fields={fields}', self.create_row)
+
+    def test_receipts(self):
+        self.assertConstantListQueries('/api/receipts/', self.create_row)
+
+    def test_receipts_with_fields(self):
+        # Method fields read payment.invoice.order.customer
+        for fields in ('invoice_details', 'payment_details'):
+            with self.subTest(fields):
+                self.assertConstantListQueries(f'/api/receipts/?fields={fields}', self.create_row)
+
+    def test_feedbacks(self):
+        self.assertConstantListQueries('/api/feedbacks/', self.create_row)
+
+
+class OrderFilterPlanTests(TestCase):
+    """
+    Every order list filter is served by an index instead of a table scan.
+    """
+    cases = {
+        'status': {'status': 'pending'},
+        'customer': {'customer': '1'},
+        'assigned_washer': {'assigned_washer': '1'},
+        'assigned_ironer': {'assigned_ironer': '1'},
+        'unassigned washer': {'assigned_washer': 'null'},
+        'assigned_washer + status': {'assigned_washer': '1', 'status': 'processing'},
+        'delivery_type': {'delivery_type': 'pickup'},
+        'created range': {'created_after': '2026-01-01', 'created_before': '2026-01-31'},
+    }
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Small tables are always cheaper to scan; ask whether an
+            # index *can* serve the query
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def filtered_queryset(self, params):
+        from .views import OrderViewSet
+
+        request = Request(APIRequestFactory().get('/api/orders/', params))
+        queryset = Order.objects.order_by('-created_at', '-id')
+        return QueryParamFilterBackend().filter_queryset(request, queryset, OrderViewSet)[:51]
+
+    def is_table_scan(self, plan):
+        table = Order._meta.db_table
+        if connection.vendor == 'postgresql':
+            return f'Seq Scan on {table}' in plan
+        if connection.vendor == 'sqlite':
+            return any(
+                line.strip().endswith(f'SCAN {table}') or f'SCAN {table} USING INDEX' in line
+                for line in plan.splitlines()
+            )
+        return False
+
+    def test_filters_use_an_index(self):
+        for name, params in self.cases.items():
+            with self.subTest(name):
+                plan = self.filtered_queryset(params).explain()
+                self.assertFalse(self.is_table_scan(plan), f'{name} scans the table:\n{plan}')
+
+
+class BulkOrderStatusTests(OrderTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.orders = {current: self.create_order(current).pk for current in ('pending', 'processing', 'delivered')}
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('clerk', 'clerk@example.com', 'secret'))
+
+    def test_invalid_transitions_are_rejected(self):
+        response = self.client.patch('/api/orders/bulk-status/', {
+            'ids': [self.orders['pending'], self.orders['processing'], self.orders['delivered']],
+            'status': 'ready',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], [self.orders['processing']])
+        self.assertEqual(response.json()['rejected'], [
+            {'id': self.orders['pending'], 'status': 'pending'},
+            {'id': self.orders['delivered'], 'status': 'delivered'},
+        ])
+        self.assertEqual(
+            dict(Order.objects.values_list('pk', 'status')),
+            {self.orders['pending']: 'pending', self.orders['processing']: 'ready', self.orders['delivered']: 'delivered'},
+        )
+
+    def test_unknown_ids_fail_the_batch(self):
+        response = self.client.patch('/api/orders/bulk-status/', {
+            'ids': [self.orders['processing'], 999], 'status': 'ready',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['missing'], [999])
+        self.assertEqual(Order.objects.get(pk=self.orders['processing']).status, 'processing')
+
+
+class OrderReadySmsTests(OrderTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.order = self.create_order()
+
+    def test_repeated_ready_patch_queues_one_sms(self):
+        url = f'/api/orders/{self.order.pk}/status/'
+        for _ in range(2):
+            response = APIClient().patch(url, {'status': 'ready'}, format='json')
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ClaimsUserTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('clerk', 'clerk@example.com', 'secret', is_staff=True)
+        self.client = APIClient()
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+    def test_staff_flag_follows_the_user_row(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').json()['role'], 'admin')
+        self.user.is_staff = False
+        self.user.save()
+
+        response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.json()['is_staff'], False)
+        self.assertEqual(response.json()['role'], 'customer')
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class RevocationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        revocation.clear_local()
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'secret')
+
+    def test_filter_screens_unrevoked_tokens(self):
+        jti = ClaimsRefreshToken.for_user(self.user)['jti']
+        # The first check loads the filter and still asks the table
+        self.assertTrue(revocation.might_be_revoked(jti))
+        self.assertFalse(revocation.might_be_revoked(jti))
+
+    def test_token_blacklisted_before_commit_is_rejected(self):
+        token = ClaimsRefreshToken.for_user(self.user)
+        revocation.might_be_revoked(token['jti'])
+        revocation.might_be_revoked(token['jti'])
+        # The test transaction never commits, so the generation bump in
+        # on_commit never runs
+        token.blacklist()
+
+        response = APIClient().post('/api/auth/token/refresh/', {'refresh': str(token)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class LastLoginBufferTests(TestCase):
+
+    @override_settings(LAST_LOGIN_FLUSH_INTERVAL=60, LAST_LOGIN_MAX_PENDING=2)
+    def test_full_buffer_is_written_without_waiting(self):
+        users = [User.objects.create_user(name) for name in ('ada', 'bola')]
+        for user in users:
+            last_login.record(user.pk)
+
+        self.assertFalse(User.objects.filter(last_login__isnull=True).exists())
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class AvailabilityTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user('ada', 'ada@example.com', 'secret')
+
+    def register(self, username, email):
+        return APIClient().post('/api/auth/register/', {
+            'username': username, 'email': email, 'password': 'secret123', 'password2': 'secret123',
+            'phone': '0801',
+        }, format='json')
+
+    def test_usernames_and_emails_are_unique_ignoring_case(self):
+        response = self.register('ADA', 'Ada@Example.com')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'username', 'email'})
+        self.assertEqual(User.objects.count(), 1)
+
+    @override_settings(AVAILABILITY_THROTTLE_BURST=2, AVAILABILITY_THROTTLE_RATE=0.001)
+    def test_throttle_ignores_client_supplied_forwarded_for(self):
+        statuses = [
+            APIClient().post(
+                '/api/auth/check-username/', {'username': 'ada'}, format='json',
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{spoofed}, 203.0.113.7',
+            ).status_code
+            for spoofed in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+
+@override_settings(CACHES=LOCAL_CACHES, REPLICA_DATABASES=['replica_1'])
+class ReplicaPinTests(TestCase):
+
+    def test_pin_cookie_keeps_reads_on_the_primary(self):
+        response = HttpResponse()
+        db_router.pin(RequestFactory().post('/api/orders/'), response)
+
+        request = RequestFactory().get('/api/orders/')
+        request.user = AnonymousUser()
+        self.assertTrue(db_router.can_use_replica(request))
+        request.COOKIES[db_router.PIN_COOKIE] = response.cookies[db_router.PIN_COOKIE].value
+        self.assertFalse(db_router.can_use_replica(request))
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class CustomerSearchTests(TestCase):
+
+    def setUp(self):
+        self.ada = Customer.objects.create(
+            name='Ada Obi', email='search.ada@example.com', phone='+234 801 234 5678', address='Lagos'
+        )
+        self.bola = Customer.objects.create(
+            name='Bola Adeyemi', email='bola@example.com', phone='0703 111 2222', address='Ibadan'
+        )
+
+    def search(self, query):
+        response = APIClient().get('/api/customers/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [customer['id'] for customer in response.json()]
+
+    def test_name(self):
+        self.assertEqual(self.search('ad'), [self.ada.pk, self.bola.pk])
+        self.assertEqual(self.search('obi ada'), [self.ada.pk])
+
+    def test_phone(self):
+        self.assertEqual(self.search('08012345678'), [self.ada.pk])
+        self.assertEqual(self.search('0703'), [self.bola.pk])
+
+    def test_email(self):
+        self.assertEqual(self.search('Search.Ada@example.com'), [self.ada.pk])
+
+    def test_email_prefix(self):
+        self.assertEqual(self.search('search.ada@exa'), [self.ada.pk])
+        self.assertEqual(self.search('bola@'), [self.bola.pk])
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class CatalogListTests(TestCase):
+
+    def setUp(self):
+        catalog.clear_local()
+        GarmentType.objects.create(name='agbada', base_price=Decimal('2500'))
+
+    def test_cached_list_does_not_hold_the_serializer(self):
+        first = APIClient().get('/api/garment-types/')
+        second = APIClient().get('/api/garment-types/')
+
+        self.assertEqual(first.json(), second.json())
+        cached = catalog.get_list_data('garment_types', lambda: self.fail('list was not cached'))
+        self.assertIs(type(cached), list)
+
+
+@override_settings(CACHES=LOCAL_CACHES, REPLICA_DATABASES=['replica_1'])
+class StatisticsRefillTests(TransactionTestCase):
+    # Outside a transaction, so the router really sends reads to the replica
+
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidated_block_is_rebuilt_on_the_primary(self):
+        statistics.invalidate(statistics.ORDERS)
+        # replica_1 isn't a configured database; reading from it would fail
+        token = db_router.use_replica()
+        try:
+            stats = statistics.get_statistics(statistics.ORDERS)
+        finally:
+            db_router.use_primary(token)
+        self.assertEqual(stats[statistics.ORDERS]['total_orders'], 0)
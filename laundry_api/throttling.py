@@ -0,0 +1,53 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Per-IP token bucket kept in the shared cache, so every worker draws
+    from the same bucket.
+
+    Each client gets ``burst`` requests up front, refilled at ``rate`` per
+    second, so typing bursts pass while sustained scraping is slowed down.
+    Override ``scope`` to give a view its own buckets and settings
+    (``<SCOPE>_THROTTLE_RATE`` / ``<SCOPE>_THROTTLE_BURST``).
+
+    Clients are told apart by ``get_ident``, which only trusts as many
+    X-Forwarded-For hops as ``REST_FRAMEWORK['NUM_PROXIES']``. Like DRF's
+    own throttles, concurrent requests may overshoot the bucket slightly.
+    """
+    scope = 'default'
+    default_rate = 5
+    default_burst = 20
+    cache_format = 'laundry_api:throttle:%(scope)s:%(ident)s'
+
+    def __init__(self):
+        prefix = self.scope.upper()
+        self.rate = getattr(settings, f'{prefix}_THROTTLE_RATE', self.default_rate)
+        self.burst = getattr(settings, f'{prefix}_THROTTLE_BURST', self.default_burst)
+        self.deficit = 0
+
+    def allow_request(self, request, view):
+        key = self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+        now = time.time()
+        tokens, updated = cache.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + max(now - updated, 0) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.deficit = 1 - tokens
+        # A bucket that has refilled behaves like a new one, so let it expire
+        cache.set(key, (tokens, now), timeout=math.ceil(self.burst / self.rate) if self.rate else None)
+        return allowed
+
+    def wait(self):
+        return self.deficit / self.rate if self.rate else None
+
+
+class AvailabilityThrottle(TokenBucketThrottle):
+    scope = 'availability'
@@ -6,7 +6,8 @@ from .views import (
     ServiceTypeViewSet, OrderViewSet, InvoiceViewSet,
     PaymentViewSet, FeedbackViewSet, ReceiptViewSet,
     RegisterView, LoginView, LogoutView, UserProfileView,
-    check_username, check_email, update_order_status, update_payment_status, AssignOrderStaffView
+    check_username, check_email, update_order_status, update_payment_status, AssignOrderStaffView,
+    dashboard_statistics, revenue_report
 )
 
 router = DefaultRouter()
@@ -24,6 +25,8 @@ urlpatterns = [
     path('', include(router.urls)),
     path('orders/<int:pk>/status/', update_order_status, name='order-status-update'),
     path('payments/<int:pk>/status/', update_payment_status, name='payment-status-update'),
+    path('dashboard/', dashboard_statistics, name='dashboard-statistics'),
+    path('reports/revenue/', revenue_report, name='revenue-report'),
     # Authentication endpoints
     path('auth/register/', RegisterView.as_view(), name='register'),
     path('auth/login/', LoginView.as_view(), name='login'),
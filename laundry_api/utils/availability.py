@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.functions import Lower
+
+FIELDS = ('username', 'email')
+DEFAULT_FREE_TTL = 60
+DEFAULT_TAKEN_TTL = 600
+DEFAULT_MAX_ENTRIES = 10000
+
+_lock = threading.Lock()
+# (field, normalized value) -> (expires at, taken)
+_answers = OrderedDict()
+
+
+def normalize(value):
+    return (value or '').strip().lower()
+
+
+def _remember(key, taken):
+    ttl = (
+        getattr(settings, 'AVAILABILITY_TAKEN_TTL', DEFAULT_TAKEN_TTL) if taken
+        else getattr(settings, 'AVAILABILITY_FREE_TTL', DEFAULT_FREE_TTL)
+    )
+    with _lock:
+        _answers[key] = (time.monotonic() + ttl, taken)
+        _answers.move_to_end(key)
+        while len(_answers) > getattr(settings, 'AVAILABILITY_CACHE_SIZE', DEFAULT_MAX_ENTRIES):
+            _answers.popitem(last=False)
+
+
+def is_taken(field, value):
+    """
+    Whether a user already has this username or email, ignoring case.
+
+    Answers are kept in-process: "free" only briefly, since another worker
+    may register the name, "taken" for longer. Registrations in this
+    process update the cache directly.
+    """
+    value = normalize(value)
+    if not value:
+        return False
+
+    key = (field, value)
+    with _lock:
+        entry = _answers.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    taken = exists(field, value)
+    _remember(key, taken)
+    return taken
+
+
+def exists(field, value):
+    """
+    Uncached form of ``is_taken``, for registration itself: a cached "free"
+    may be stale.
+    """
+    from django.contrib.auth.models import User
+
+    value = normalize(value)
+    if not value:
+        return False
+    # Matches the LOWER(...) expression indexes on auth_user
+    return User.objects.annotate(normalized=Lower(field)).filter(normalized=value).exists()
+
+
+def mark_taken(**values):
+    """
+    Record new registrations, e.g. ``mark_taken(username='ada', email=...)``.
+    """
+    for field, value in values.items():
+        value = normalize(value)
+        if field in FIELDS and value:
+            _remember((field, value), True)
@@ -0,0 +1,107 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'laundry_api:catalog_version'
+DEFAULT_CHECK_INTERVAL = 5
+
+_lock = threading.Lock()
+_state = {
+    'version': None,
+    'checked_at': 0.0,
+    'prices': None,
+    'lists': {},
+}
+
+
+def _check_interval():
+    return getattr(settings, 'CATALOG_CACHE_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+
+
+def _sync_version(force=False):
+    """
+    Drop this process's copy when another process has bumped the shared
+    version. Unless ``force`` is set, the shared key is only consulted every
+    ``CATALOG_CACHE_CHECK_INTERVAL`` seconds, which bounds how long a
+    worker can serve prices from before an admin edit.
+    """
+    now = time.monotonic()
+    if not force and _state['version'] is not None and now - _state['checked_at'] < _check_interval():
+        return
+
+    version = cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, None)
+    if version != _state['version']:
+        _state['prices'] = None
+        _state['lists'] = {}
+        _state['version'] = version
+    _state['checked_at'] = now
+
+
+def get_price_catalog():
+    """
+    Return the process-wide ``PriceCatalog``, loading it on first use.
+    """
+    from .pricing import PriceCatalog
+
+    with _lock:
+        _sync_version()
+        if _state['prices'] is None:
+            _state['prices'] = PriceCatalog.load()
+        return _state['prices']
+
+
+def get_catalog_version():
+    """
+    Return the shared catalog version, first dropping this process's copy
+    if it is older, so validators built from it are the same on every
+    worker and match the lists served afterwards.
+    """
+    with _lock:
+        _sync_version(force=True)
+        return _state['version']
+
+
+def unit_price(garment_type_id, service_type_id):
+    """
+    Price one line from the cached catalog, reloading once if either row
+    was added since this process's copy was loaded.
+    """
+    try:
+        return get_price_catalog().unit_price(garment_type_id, service_type_id)
+    except KeyError:
+        clear_local()
+        return get_price_catalog().unit_price(garment_type_id, service_type_id)
+
+
+def get_list_data(name, loader):
+    """
+    Return the cached serialized list ``name``, building it with ``loader``
+    on first use. ``loader`` should return plain data, not a serializer's
+    ``ReturnList``.
+    """
+    with _lock:
+        _sync_version()
+        if name not in _state['lists']:
+            _state['lists'][name] = loader()
+        return _state['lists'][name]
+
+
+def clear_local():
+    """
+    Forget this process's copy without touching the shared version.
+    """
+    with _lock:
+        _state['version'] = None
+        _state['prices'] = None
+        _state['lists'] = {}
+
+
+def invalidate():
+    """
+    Publish a new catalog version so every worker reloads.
+    """
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+    clear_local()
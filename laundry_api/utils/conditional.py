@@ -0,0 +1,36 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def queryset_validators(queryset, field='updated_at'):
+    """
+    Return (latest ``field`` value, row count) for ``queryset`` with one
+    aggregate query; together they change whenever a row is added,
+    removed or saved.
+    """
+    stats = queryset.order_by().aggregate(last_modified=Max(field), count=Count('pk'))
+    return stats['last_modified'], stats['count']
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Return a 304 response when the request's validators still match, or
+    None when the full response has to be built.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified=None):
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,105 @@
+import re
+
+from django.db import connections
+from django.db.models.functions import Lower
+
+# Upper bound for prefix range scans; sorts after any character under a
+# code point (binary) collation
+PREFIX_END = '\U0010ffff'
+MIN_PHONE_DIGITS = 3
+DEFAULT_LIMIT = 20
+
+
+def normalize_phone(phone):
+    """
+    Digits only, with the +234 country code folded to the local 0 prefix so
+    '+234 801 234 5678' and '08012345678' index the same.
+    """
+    digits = re.sub(r'\D', '', phone or '')
+    if digits.startswith('234') and len(digits) == 13:
+        digits = '0' + digits[3:]
+    return digits
+
+
+def _words(text):
+    return [word for word in re.split(r'[^\w]+', (text or '').lower()) if word]
+
+
+def _query_words(query):
+    # Email addresses are indexed whole, so keep anything with an @ in one
+    # piece instead of splitting it at the dots
+    words = []
+    for part in query.lower().split():
+        words.extend([part[:100]] if '@' in part else _words(part))
+    return words
+
+
+def tokens_for(customer):
+    """
+    Lower-cased name words plus the email and its local part.
+    """
+    tokens = set(_words(customer.name))
+    email = (customer.email or '').lower()
+    if email:
+        tokens.add(email[:100])
+        tokens.add(email.split('@')[0][:100])
+    return {token[:100] for token in tokens}
+
+
+def _prefix(queryset, field, value):
+    if connections[queryset.db].vendor == 'postgresql':
+        # LIKE 'value%' is served by the varchar_pattern_ops index Django
+        # adds next to db_index, and compares bytes whatever the database
+        # collation; a range would follow the collation's ordering
+        return queryset.filter(**{f'{field}__startswith': value})
+    # A range instead of LIKE, which SQLite only indexes case-insensitively
+    return queryset.filter(**{f'{field}__gte': value, f'{field}__lt': value + PREFIX_END})
+
+
+def _matching_all(words, token_filter):
+    from ..models import Customer, CustomerSearchToken
+
+    customers = Customer.objects.all()
+    for word in words:
+        customers = customers.filter(pk__in=token_filter(CustomerSearchToken.objects, word).values('customer_id'))
+    return customers.order_by(Lower('name'), 'pk')
+
+
+def search(query, limit=DEFAULT_LIMIT):
+    """
+    Find customers by phone, name or email prefix.
+
+    Exact phone matches come first, then phone prefixes. Otherwise
+    customers with a token equal to every search word come first, then
+    those with a token starting with every word, each group by name.
+    """
+    from ..models import Customer
+
+    query = (query or '').strip()
+    if not query:
+        return []
+
+    ranked = []
+    seen = set()
+
+    def take(customers):
+        for customer in customers:
+            if customer.pk not in seen and len(ranked) < limit:
+                seen.add(customer.pk)
+                ranked.append(customer)
+
+    digits = normalize_phone(query)
+    if len(digits) >= MIN_PHONE_DIGITS and re.fullmatch(r'[\d\s+()-]+', query):
+        take(Customer.objects.filter(phone_digits=digits)[:limit])
+        take(_prefix(Customer.objects, 'phone_digits', digits).order_by('phone_digits')[:limit])
+        return ranked
+
+    words = _query_words(query)
+    if not words:
+        return ranked
+
+    take(_matching_all(words, lambda tokens, word: tokens.filter(token=word))[:limit])
+    if len(ranked) < limit:
+        # Exact matches are a subset of these; fetch enough to skip them
+        take(_matching_all(words, lambda tokens, word: _prefix(tokens, 'token', word))[:limit + len(ranked)])
+    return ranked
@@ -0,0 +1,231 @@
+import atexit
+import os
+import queue
+import threading
+import weakref
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+ADMIN_GROUP = 'admin_notifications'
+CACHE_KEY_PREFIX = 'laundry_api:events:'
+SEQUENCE_KEY = CACHE_KEY_PREFIX + 'seq'
+DEFAULT_REPLAY_SIZE = 500
+DEFAULT_REPLAY_TTL = 60 * 60
+
+# Orders an admin board still has to act on
+ACTIVE_STATUSES = ('pending', 'processing', 'ready')
+
+NEW_ORDER = 'NEW_ORDER'
+ORDER_STATUS_CHANGED = 'ORDER_STATUS_CHANGED'
+ORDER_ASSIGNED = 'ORDER_ASSIGNED'
+PAYMENT_COMPLETED = 'PAYMENT_COMPLETED'
+# Sent by the admin consumer when an order leaves a client's filters
+ORDER_REMOVED = 'ORDER_REMOVED'
+
+_local = threading.local()
+# Batches waiting for the sender thread, in commit order
+_outgoing = queue.Queue()
+_sender_lock = threading.Lock()
+_sender = {'thread': None, 'pid': None}
+
+
+class _Held:
+    """
+    An on_commit hook that does nothing but keep one event alive until
+    commit. Django drops it if its savepoint rolls back.
+    """
+    __slots__ = ('key', 'event', '__weakref__')
+
+    def __init__(self, key, event):
+        self.key = key
+        self.event = event
+
+    def __call__(self):
+        pass
+
+
+class _Batch:
+    """
+    Events published during one transaction, in first-published order.
+
+    ``flush`` is registered once, before any event, so it runs first at
+    commit while the events' own hooks are still pending. It sends the
+    events whose hooks survived, merged per key, in one message.
+
+    Hooks hold the only strong references: when the transaction rolls
+    back, Django drops them and the batch and its events go with them.
+    """
+
+    def __init__(self):
+        self.held = []
+
+    def add(self, key, event):
+        held = _Held(key, event)
+        self.held.append(weakref.ref(held))
+        return held
+
+    def flush(self):
+        _local.batch = None
+        merged = {}
+        for ref in self.held:
+            held = ref()
+            if held is None:
+                continue
+            if held.key in merged:
+                # Later events for the same object update the first one,
+                # which keeps its type: a new order that moved on is still
+                # NEW_ORDER
+                merged[held.key].update(
+                    (name, value) for name, value in held.event.items() if name != 'type'
+                )
+            else:
+                merged[held.key] = dict(held.event)
+        send(list(merged.values()))
+
+
+def _replay_size():
+    return getattr(settings, 'EVENT_REPLAY_SIZE', DEFAULT_REPLAY_SIZE)
+
+
+def _delta_key(seq):
+    return f'{CACHE_KEY_PREFIX}delta:{seq}'
+
+
+def current_sequence():
+    return cache.get(SEQUENCE_KEY, 0)
+
+
+def _sequence(events):
+    """
+    Number ``events`` from the shared counter and keep them for replay.
+    """
+    cache.add(SEQUENCE_KEY, 0, timeout=None)
+    last = cache.incr(SEQUENCE_KEY, len(events))
+    for seq, event in enumerate(events, start=last - len(events) + 1):
+        event['seq'] = seq
+    cache.set_many(
+        {_delta_key(event['seq']): event for event in events},
+        timeout=getattr(settings, 'EVENT_REPLAY_TTL', DEFAULT_REPLAY_TTL),
+    )
+
+
+def replay(last_seq):
+    """
+    The deltas after ``last_seq`` in order, or None when some of them are no
+    longer kept and the client needs a fresh snapshot instead.
+    """
+    current = current_sequence()
+    if last_seq > current or current - last_seq > _replay_size():
+        return None
+    keys = [_delta_key(seq) for seq in range(last_seq + 1, current + 1)]
+    found = cache.get_many(keys)
+    if len(found) != len(keys):
+        return None
+    return [found[key] for key in keys]
+
+
+def board_snapshot():
+    """
+    Compact rows for every active order, with the sequence they reflect.
+    """
+    from ..models import Order
+
+    # Read the sequence first; later deltas may repeat what the rows show,
+    # which clients can apply again safely
+    seq = current_sequence()
+    orders = list(
+        Order.objects.filter(status__in=ACTIVE_STATUSES)
+        .order_by('created_at', 'id')
+        .values(
+            'id', 'order_number', 'status', 'delivery_type', 'total_amount',
+            'assigned_washer_id', 'assigned_ironer_id', 'created_at',
+            customer_name=F('customer__name'),
+        )
+    )
+    for order in orders:
+        order['total_amount'] = str(order['total_amount'])
+        order['created_at'] = order['created_at'].isoformat()
+    return {'type': 'SNAPSHOT', 'seq': seq, 'orders': orders}
+
+
+def _deliver(events):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        _sequence(events)
+        async_to_sync(channel_layer.group_send)(
+            ADMIN_GROUP,
+            {'type': 'send_notifications', 'events': events},
+        )
+    except Exception as e:
+        # Notifications are best effort; the data is already committed
+        print("Error publishing events:", e)
+
+
+def _run_sender():
+    while True:
+        events = _outgoing.get()
+        try:
+            _deliver(events)
+        finally:
+            _outgoing.task_done()
+
+
+def send(events):
+    """
+    Hand ``events`` to this process's sender thread, which numbers them and
+    delivers them to the admin group in a single channel layer message, so
+    the request doesn't wait on Redis.
+    """
+    if not events:
+        return
+    with _sender_lock:
+        # Threads don't survive a fork
+        if _sender['pid'] != os.getpid() or not _sender['thread'].is_alive():
+            _sender['thread'] = threading.Thread(target=_run_sender, name='admin-events', daemon=True)
+            _sender['thread'].start()
+            _sender['pid'] = os.getpid()
+    _outgoing.put(events)
+
+
+def wait():
+    """
+    Block until every batch handed to the sender thread has been delivered.
+    """
+    with _sender_lock:
+        running = _sender['pid'] == os.getpid() and _sender['thread'].is_alive()
+    if running:
+        _outgoing.join()
+
+
+def publish(event_type, key, **data):
+    """
+    Queue an admin notification for ``key`` (e.g. ``('order', 42)``).
+
+    Outside a transaction it is sent straight away. Inside one it is held
+    until commit, merged with any other events for the same key, and sent
+    with the rest of the transaction's events in one message. Events from
+    a rolled-back savepoint are dropped with it.
+    """
+    event = {'type': event_type, **data}
+    if not transaction.get_connection().in_atomic_block:
+        send([event])
+        return
+
+    ref = getattr(_local, 'batch', None)
+    batch = ref() if ref is not None else None
+    if batch is None:
+        batch = _Batch()
+        _local.batch = weakref.ref(batch)
+        transaction.on_commit(batch.flush)
+    transaction.on_commit(batch.add(key, event))
+
+
+# Deliver what is still queued when the worker shuts down
+atexit.register(wait)
@@ -0,0 +1,173 @@
+import decimal
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+_renderers = {}
+
+
+class Unsupported(Exception):
+    """Raised when a serializer field has no ``.values()`` equivalent."""
+
+
+def _identity(value):
+    return value
+
+
+def _decimal_mapper(field):
+    # Same result as DecimalField.to_representation for stored values
+    if not getattr(field, 'coerce_to_string', True) or field.localize or field.normalize_output:
+        return field.to_representation
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def to_string(value):
+        return f'{value.quantize(exponent, rounding=rounding, context=context):f}'
+    return to_string
+
+
+def _resolve_model_field(model, path):
+    """
+    Follow a dotted serializer ``source`` and return (values path, model
+    field, display attribute) for it. The attribute is only set for
+    sources ending in ``get_<field>_display``.
+    """
+    parts = path.split('.')
+    lookups = []
+    field = None
+    for index, part in enumerate(parts):
+        attribute = None
+        if index == len(parts) - 1 and part.startswith('get_') and part.endswith('_display'):
+            attribute, part = part, part[len('get_'):-len('_display')]
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            raise Unsupported(path)
+        lookups.append(part)
+        if attribute is not None:
+            return '__'.join(lookups), field, attribute
+        if field.is_relation and index < len(parts) - 1:
+            model = field.related_model
+    return '__'.join(lookups), field, None
+
+
+class ValuesRenderer:
+    """
+    Renders a serializer's list representation from ``.values()`` rows.
+
+    Every readable field is compiled once into a (values path, mapper)
+    pair, so a row is built with plain dict lookups instead of DRF's
+    per-field ``get_attribute``/``to_representation`` calls. Nested
+    ``many=True`` serializers are loaded with one extra query per level.
+    """
+
+    def __init__(self, serializer):
+        self.model = serializer.Meta.model
+        self.columns = {'pk'}
+        self.mappers = []
+        self.nested = []
+        overrides = getattr(serializer.Meta, 'values_fields', {})
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in overrides:
+                # Override mappers also receive None
+                path, mapper = overrides[name]
+                self._add(name, path, mapper, raw=True)
+            elif isinstance(field, serializers.ListSerializer):
+                self._add_nested(name, field)
+            elif isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)):
+                raise Unsupported(name)
+            else:
+                self._add_field(name, field)
+
+    def _add(self, name, path, mapper, raw=False):
+        self.columns.add(path)
+        self.mappers.append((name, path, mapper, raw))
+
+    def _add_field(self, name, field):
+        if field.source in ('*', None):
+            raise Unsupported(name)
+        path, model_field, attribute = _resolve_model_field(self.model, field.source)
+
+        if attribute is not None:
+            # e.g. service_type.get_name_display
+            choices = dict(model_field.flatchoices)
+            self._add(name, path, lambda value: choices.get(value, value))
+        elif isinstance(field, serializers.RelatedField):
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                raise Unsupported(name)
+            self._add(name, path, _identity)
+        elif isinstance(field, serializers.DecimalField):
+            self._add(name, path, _decimal_mapper(field))
+        elif isinstance(field, (serializers.DateTimeField, serializers.DateField, serializers.TimeField)):
+            self._add(name, path, field.to_representation)
+        elif isinstance(field, (
+            serializers.CharField, serializers.IntegerField,
+            serializers.BooleanField, serializers.ChoiceField,
+        )):
+            self._add(name, path, _identity)
+        else:
+            raise Unsupported(name)
+
+    def _add_nested(self, name, field):
+        relation = self.model._meta.get_field(field.source)
+        if not relation.one_to_many:
+            raise Unsupported(name)
+        child = ValuesRenderer(field.child)
+        link = relation.field.attname
+        child.columns.add(link)
+        self.nested.append((name, child, relation.field.name, link))
+        self.mappers.append((name, None, None, False))
+
+    def values(self, queryset):
+        """
+        Turn ``queryset`` into the ``.values()`` query this renderer reads.
+        """
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def render(self, rows):
+        rows = list(rows)
+        children = {}
+        if rows and self.nested:
+            ids = [row['pk'] for row in rows]
+            for name, child, link_name, link in self.nested:
+                grouped = defaultdict(list)
+                child_rows = child.values(child.model.objects.filter(**{f'{link_name}__in': ids}))
+                for child_row in child.render_pairs(child_rows):
+                    grouped[child_row[0][link]].append(child_row[1])
+                children[name] = grouped
+
+        return [self._render_row(row, children) for row in rows]
+
+    def render_pairs(self, rows):
+        rows = list(rows)
+        return zip(rows, self.render(rows))
+
+    def _render_row(self, row, children):
+        data = {}
+        for name, path, mapper, raw in self.mappers:
+            if path is None:
+                data[name] = children.get(name, {}).get(row['pk'], [])
+                continue
+            value = row[path]
+            data[name] = None if value is None and not raw else mapper(value)
+        return data
+
+
+def get_values_renderer(serializer_class):
+    """
+    Return the compiled renderer for ``serializer_class``, or None when one
+    of its fields can't be read from ``.values()``.
+    """
+    if serializer_class not in _renderers:
+        try:
+            _renderers[serializer_class] = ValuesRenderer(serializer_class())
+        except Unsupported:
+            _renderers[serializer_class] = None
+    return _renderers[serializer_class]
@@ -0,0 +1,63 @@
+import hashlib
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+CACHE_KEY_PREFIX = 'laundry_api:jwt:'
+
+
+def _claims_key(raw_token):
+    # Never use the token itself as a key; it is a credential
+    return CACHE_KEY_PREFIX + 'claims:' + hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+def _user_key(user_id):
+    return f'{CACHE_KEY_PREFIX}user:{user_id}'
+
+
+def _remaining(claims):
+    return max(int(claims['exp'] - time.time()), 0)
+
+
+def validate_access_token(raw_token):
+    """
+    Return the claims of a valid access token, caching them until it
+    expires so a reconnecting client skips signature checks.
+
+    Raises ``TokenError`` for invalid or expired tokens.
+    """
+    key = _claims_key(raw_token)
+    claims = cache.get(key)
+    if claims is None:
+        claims = dict(AccessToken(raw_token).payload)
+        cache.set(key, claims, timeout=_remaining(claims))
+    elif _remaining(claims) <= 0:
+        raise TokenError('Token is expired')
+    return claims
+
+
+def get_user(claims):
+    """
+    The active user a token belongs to, or None, cached for the rest of
+    the token's lifetime.
+    """
+    user_id = claims.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        return None
+
+    key = _user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not user.is_active:
+            return None
+        cache.set(key, user, timeout=_remaining(claims))
+    return user
+
+
+def invalidate_user(user_id):
+    cache.delete(_user_key(user_id))
@@ -0,0 +1,116 @@
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+DEFAULT_FLUSH_INTERVAL = 5
+DEFAULT_MAX_PENDING = 500
+FLUSH_BATCH_SIZE = 500
+
+_lock = threading.Lock()
+_pending = {}
+_timer = None
+
+
+def _flush_interval():
+    return getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+
+def record(user_id, when=None):
+    """
+    Note a login for ``user_id``. The timestamp reaches ``auth_user``
+    within ``LAST_LOGIN_FLUSH_INTERVAL`` seconds, together with every other
+    login in that window; an interval of 0 writes it straight away, as does
+    the login that fills the buffer to ``LAST_LOGIN_MAX_PENDING``.
+    """
+    when = when or timezone.now()
+    interval = _flush_interval()
+
+    with _lock:
+        if _pending.get(user_id) is None or _pending[user_id] < when:
+            _pending[user_id] = when
+        if interval > 0:
+            _schedule(interval)
+        full = len(_pending) >= getattr(settings, 'LAST_LOGIN_MAX_PENDING', DEFAULT_MAX_PENDING)
+
+    if interval <= 0 or full:
+        flush()
+
+
+def _schedule(interval):
+    # Caller holds _lock
+    global _timer
+    if _timer is None:
+        _timer = threading.Timer(interval, _flush_from_timer)
+        _timer.daemon = True
+        _timer.start()
+
+
+def flush():
+    """
+    Write every buffered timestamp with one UPDATE per batch.
+    """
+    from django.contrib.auth import get_user_model
+
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return 0
+
+    User = get_user_model()
+    items = list(pending.items())
+    try:
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            User.objects.filter(pk__in=[user_id for user_id, _ in batch]).update(
+                last_login=Case(*(When(pk=user_id, then=Value(when)) for user_id, when in batch))
+            )
+    except Exception:
+        # Keep them for the next flush unless a newer login replaced them
+        with _lock:
+            for user_id, when in pending.items():
+                if _pending.get(user_id) is None or _pending[user_id] < when:
+                    _pending[user_id] = when
+        raise
+    return len(items)
+
+
+def _flush_from_timer():
+    global _timer
+    with _lock:
+        _timer = None
+    close_old_connections()
+    try:
+        flush()
+    except Exception as e:
+        print("Error flushing last_login:", e)
+        with _lock:
+            _schedule(_flush_interval())
+    finally:
+        # This thread's connection isn't reused
+        connection.close()
+
+
+def flush_on_exit():
+    """
+    Write whatever is still buffered when the process stops. Registered
+    with atexit, and called from gunicorn's worker hooks (gunicorn.conf.py).
+    """
+    if not _pending:
+        return
+    # gunicorn's abort hook runs in a signal handler, possibly while the
+    # interrupted code holds the lock
+    if not _lock.acquire(timeout=1):
+        return
+    _lock.release()
+    try:
+        flush()
+    except Exception as e:
+        print("Error flushing last_login on exit:", e)
+
+
+atexit.register(flush_on_exit)
@@ -1,21 +1,104 @@
-from twilio.rest import Client
+import time
+
 from django.conf import settings
+from django.utils.module_loading import import_string
 
-def send_sms(to_phone: str, message: str):
+DEFAULT_BACKEND = 'laundry_api.utils.notifications.TwilioBackend'
+
+_backend = None
+
+def order_ready_message(customer_name: str, order_number: str):
+    return (
+        f"Hello {customer_name}, your laundry order #{order_number} "
+        f"is ready for pickup/delivery. Thank you!"
+    )
+
+def order_ready_key(order_id, changed_at):
     """
-    Send SMS to a customer using Twilio.
+    One message per order per transition to 'ready'.
     """
-    if not to_phone:
-        return False
+    return f"order-ready:{order_id}:{changed_at.timestamp():.6f}"
 
-    try:
-        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-        client.messages.create(
+class TwilioBackend:
+    """
+    Sends through one Twilio client whose HTTP session keeps its
+    connections open between messages.
+    """
+
+    def __init__(self, concurrency=1):
+        from requests.adapters import HTTPAdapter
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        http_client = TwilioHttpClient(pool_connections=True, timeout=10)
+        # One pooled connection per worker thread
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(concurrency, 1))
+        http_client.session.mount('https://', adapter)
+        self.client = Client(
+            settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, http_client=http_client
+        )
+
+    def send(self, to_phone, message):
+        self.client.messages.create(
             body=message,
             from_=settings.TWILIO_PHONE_NUMBER,
             to=to_phone
         )
+
+class FakeBackend:
+    """
+    Keeps sent messages in ``FakeBackend.sent`` instead of calling a
+    provider. ``SMS_FAKE_LATENCY`` (seconds) simulates a slow provider.
+    """
+    sent = []
+
+    def __init__(self, concurrency=1):
+        self.latency = getattr(settings, 'SMS_FAKE_LATENCY', 0)
+
+    def send(self, to_phone, message):
+        if self.latency:
+            time.sleep(self.latency)
+        self.sent.append((to_phone, message))
+
+def get_backend(concurrency=1):
+    """
+    The configured ``SMS_BACKEND``, built once per process.
+    """
+    global _backend
+    if _backend is None:
+        backend_class = import_string(getattr(settings, 'SMS_BACKEND', DEFAULT_BACKEND))
+        _backend = backend_class(concurrency=concurrency)
+    return _backend
+
+def send_sms(to_phone: str, message: str):
+    """
+    Send SMS to a customer straight away, bypassing the outbox.
+    """
+    if not to_phone:
+        return False
+
+    try:
+        get_backend().send(to_phone, message)
         return True
     except Exception as e:
         print("Error sending SMS:", e)
         return False
+
+def queue_sms_batch(messages):
+    """
+    Write (dedup key, phone, message) triples to the outbox.
+
+    Call this inside the transaction that caused the messages so they are
+    only delivered if it commits; ``drain_notifications`` sends them.
+    Keys that are already queued are ignored.
+    """
+    from ..models import NotificationOutbox
+
+    rows = [
+        NotificationOutbox(dedup_key=key, recipient=phone, body=message)
+        for key, phone, message in messages
+        if phone
+    ]
+    if rows:
+        NotificationOutbox.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
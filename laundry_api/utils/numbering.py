@@ -0,0 +1,106 @@
+import os
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+DEFAULT_BLOCK_SIZE = 20
+
+_lock = threading.Lock()
+# name -> confirmed blocks, oldest first
+_blocks = {}
+_pid = None
+
+
+class _Block:
+    """
+    A contiguous range of sequence values reserved by this process.
+    """
+
+    def __init__(self, next_value, last_value):
+        self.next_value = next_value
+        self.last_value = last_value
+
+    def usable(self):
+        return self.next_value <= self.last_value
+
+    def take(self):
+        value = self.next_value
+        self.next_value += 1
+        return value
+
+
+def _block_size():
+    return getattr(settings, 'DOCUMENT_NUMBER_BLOCK_SIZE', DEFAULT_BLOCK_SIZE)
+
+
+def _reserve_block(name, size):
+    """
+    Atomically bump the counter row for ``name`` by ``size`` and return the
+    reserved (first, last) range.
+
+    The UPDATE row-locks the counter on Postgres and takes the database
+    write lock on SQLite, so concurrent workers can never receive
+    overlapping ranges.
+    """
+    from ..models import DocumentSequence
+
+    with transaction.atomic():
+        DocumentSequence.objects.get_or_create(name=name)
+        DocumentSequence.objects.filter(name=name).update(last_value=F('last_value') + size)
+        last_value = DocumentSequence.objects.values_list('last_value', flat=True).get(name=name)
+    return last_value - size + 1, last_value
+
+
+def _share(name, block):
+    with _lock:
+        if _pid == os.getpid() and block.usable():
+            _blocks.setdefault(name, []).append(block)
+
+
+def next_value(name):
+    """
+    Return the next unique value of the sequence ``name``.
+
+    Values come from blocks reserved for this process, so the counter row
+    is only touched once every ``DOCUMENT_NUMBER_BLOCK_SIZE`` calls.
+
+    A block reserved inside the caller's transaction is rolled back with
+    it, so only its first value is used straight away; the rest joins the
+    shared blocks once that transaction commits. Values taken from an
+    already committed block stay unique whatever the caller's transaction
+    does (a rollback only leaves a gap).
+    """
+    global _pid
+
+    with _lock:
+        # Blocks reserved before a fork must not be shared with children
+        if _pid != os.getpid():
+            _blocks.clear()
+            _pid = os.getpid()
+
+        blocks = _blocks.get(name, [])
+        while blocks and not blocks[0].usable():
+            blocks.pop(0)
+        if blocks:
+            return blocks[0].take()
+
+    first, last = _reserve_block(name, _block_size())
+    block = _Block(first, last)
+    value = block.take()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _share(name, block))
+    else:
+        _share(name, block)
+    return value
+
+
+def next_document_number(prefix):
+    """
+    Build a document number such as ``ORD20260117000000042``.
+
+    The date part is informational; uniqueness comes from the sequence.
+    """
+    return f"{prefix}{timezone.now().strftime('%Y%m%d')}{next_value(prefix):09d}"
@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+from django.db import transaction
+
+PICKUP_DELIVERY_FEE = Decimal('500.00')
+
+
+def delivery_fee_for(delivery_type):
+    """
+    Delivery fee charged for an order's delivery type.
+    """
+    return PICKUP_DELIVERY_FEE if delivery_type == 'pickup' else Decimal('0.00')
+
+
+class PriceCatalog:
+    """
+    Snapshot of garment base prices and service multipliers.
+
+    Loaded with one query per table so a whole cart (or a whole batch of
+    carts) can be priced without touching the database again.
+    """
+
+    def __init__(self, base_prices, multipliers):
+        self.base_prices = base_prices
+        self.multipliers = multipliers
+
+    @classmethod
+    def load(cls):
+        from ..models import GarmentType, ServiceType
+
+        return cls(
+            dict(GarmentType.objects.values_list('id', 'base_price')),
+            dict(ServiceType.objects.values_list('id', 'price_multiplier')),
+        )
+
+    def unit_price(self, garment_type_id, service_type_id):
+        return self.base_prices[garment_type_id] * self.multipliers[service_type_id]
+
+
+def _pk(value):
+    return getattr(value, 'pk', value)
+
+
+def price_order(order, items_data, catalog):
+    """
+    Price every line of ``items_data`` for ``order`` in a single pass.
+
+    Returns unsaved ``OrderItem`` instances and sets the order's subtotal,
+    delivery fee and total in place.
+    """
+    from ..models import OrderItem
+
+    service_type_id = order.service_type_id
+    items = []
+    subtotal = Decimal('0.00')
+
+    for item_data in items_data:
+        garment_type = item_data['garment_type']
+        quantity = item_data.get('quantity', 1)
+        unit_price = catalog.unit_price(_pk(garment_type), service_type_id)
+        total_price = unit_price * quantity
+        subtotal += total_price
+
+        item = OrderItem(
+            order=order,
+            quantity=quantity,
+            unit_price=unit_price,
+            total_price=total_price,
+        )
+        if isinstance(garment_type, int):
+            item.garment_type_id = garment_type
+        else:
+            item.garment_type = garment_type
+        items.append(item)
+
+    order.subtotal = subtotal
+    order.delivery_fee = delivery_fee_for(order.delivery_type)
+    order.total_amount = order.subtotal + order.delivery_fee
+    return items
+
+
+def create_priced_order(items_data, catalog=None, **order_fields):
+    """
+    Create an order and all of its items with one order INSERT and one
+    bulk item INSERT, inside a single transaction.
+    """
+    from ..models import Order, OrderItem
+    from . import catalog as catalog_cache
+
+    with transaction.atomic():
+        order = Order(**order_fields)
+        if catalog is not None:
+            items = price_order(order, items_data, catalog)
+        else:
+            try:
+                items = price_order(order, items_data, catalog_cache.get_price_catalog())
+            except KeyError:
+                # Row added by another worker since our copy was loaded
+                catalog_cache.clear_local()
+                items = price_order(order, items_data, catalog_cache.get_price_catalog())
+        order.save()
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
+
+    return order
@@ -0,0 +1,161 @@
+from rest_framework import serializers
+
+_plans = {}
+
+
+def _join(prefix, path):
+    return f"{prefix}__{path}" if prefix else path
+
+
+def _source_path(field):
+    if field.source in ('*', None):
+        return None
+    return field.source.replace('.', '__')
+
+
+def _declared_select(serializer):
+    """
+    ``Meta.select_related`` of ``serializer``, narrowed to the relations
+    its remaining fields still read when it has been trimmed. Method fields
+    and ``source='*'`` can read any relation, so they keep all of them.
+    """
+    declared = getattr(getattr(serializer, 'Meta', None), 'select_related', ())
+    if getattr(serializer, 'field_selection', None) is None:
+        return list(declared)
+    if any(
+        field.source in ('*', None) for field in serializer.fields.values()
+        if not field.write_only
+    ):
+        return list(declared)
+
+    used = {
+        field.source.split('.')[0]
+        for field in serializer.fields.values()
+        if field.source and '.' in field.source
+    }
+    return [path for path in declared if path.split('__')[0] in used]
+
+
+def build_plan(serializer, prefix='', in_prefetch=False):
+    """
+    Collect the ``select_related`` and ``prefetch_related`` paths needed to
+    render ``serializer`` without per-row queries.
+
+    Each serializer declares the relations its own fields touch through
+    ``Meta.select_related`` / ``Meta.prefetch_related``; nested serializers
+    are walked and their needs re-rooted under the nesting field. Anything
+    below a prefetch has to be prefetched as well.
+    """
+    meta = getattr(serializer, 'Meta', None)
+    select = set()
+    prefetch = set()
+
+    for path in _declared_select(serializer):
+        (prefetch if in_prefetch else select).add(_join(prefix, path))
+    for path in getattr(meta, 'prefetch_related', ()):
+        prefetch.add(_join(prefix, path))
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            path = _source_path(field)
+            if path is None:
+                continue
+            prefetch.add(_join(prefix, path))
+            child_select, child_prefetch = build_plan(field.child, _join(prefix, path), True)
+        elif isinstance(field, serializers.BaseSerializer):
+            path = _source_path(field)
+            if path is None:
+                continue
+            (prefetch if in_prefetch else select).add(_join(prefix, path))
+            child_select, child_prefetch = build_plan(field, _join(prefix, path), in_prefetch)
+        else:
+            continue
+        select |= child_select
+        prefetch |= child_prefetch
+
+    return select, prefetch
+
+
+def build_only(serializer):
+    """
+    Return the root model columns a trimmed serializer reads, or None when
+    that can't be worked out safely (method fields, ``source='*'`` or
+    sources that aren't model fields).
+    """
+    model = serializer.Meta.model
+    columns = {model._meta.pk.name}
+    for path in _declared_select(serializer):
+        columns.add(path.split('__')[0])
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField) or field.source in ('*', None):
+            return None
+        name = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except Exception:
+            return None
+        if model_field.concrete:
+            columns.add(name)
+        elif not (model_field.is_relation and model_field.auto_created):
+            return None
+    return sorted(columns)
+
+
+def get_plan(serializer):
+    """
+    Return the ``(select, prefetch, only)`` plan for a serializer class or
+    instance, including one trimmed by ``?fields=``/``?expand=``.
+    """
+    if isinstance(serializer, type):
+        serializer = serializer()
+    # Trimmed plans depend on client input, so only full plans are cached
+    if getattr(serializer, 'field_selection', None) is not None:
+        return _build(serializer, trimmed=True)
+
+    key = type(serializer)
+    if key not in _plans:
+        _plans[key] = _build(serializer, trimmed=False)
+    return _plans[key]
+
+
+def _build(serializer, trimmed):
+    select, prefetch = build_plan(serializer)
+    # A select_related path already covers its own prefixes
+    select = {
+        path for path in select
+        if not any(other.startswith(path + '__') for other in select)
+    }
+    only = build_only(serializer) if trimmed else None
+    return sorted(select), sorted(prefetch), only
+
+
+def _ordering_columns(queryset, ordering):
+    # Cursor pagination reads the ordering values off the last row
+    columns = set()
+    for name in (*queryset.query.order_by, *ordering):
+        if isinstance(name, str) and '__' not in name:
+            columns.add(name.lstrip('-'))
+    columns.discard('?')
+    columns.discard('pk')
+    return columns
+
+
+def optimize_queryset(queryset, serializer, ordering=()):
+    """
+    Apply the relation plan of ``serializer`` (a class or an instance) to
+    ``queryset``. ``ordering`` lists the fields a paginator will order by,
+    which a trimmed ``.only()`` has to keep.
+    """
+    select, prefetch, only = get_plan(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if only:
+        queryset = queryset.only(*only, *_ordering_columns(queryset, ordering))
+    return queryset
@@ -0,0 +1,172 @@
+import hashlib
+import math
+import secrets
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+GENERATION_KEY = 'laundry_api:revoked_jti:generation'
+EPOCH_KEY = 'laundry_api:revoked_jti:epoch'
+PENDING_KEY_PREFIX = 'laundry_api:revoked_jti:pending:'
+DEFAULT_CAPACITY = 100000
+DEFAULT_ERROR_RATE = 0.01
+DEFAULT_RELOAD_SECONDS = 60
+# Longer than DEFAULT_RELOAD_SECONDS, so a lost generation bump is covered
+# by the periodic load before the pending flag expires
+DEFAULT_PENDING_SECONDS = 300
+# Overlap between incremental loads, covering rows committed out of id order
+RELOAD_OVERLAP = timedelta(minutes=5)
+
+_lock = threading.Lock()
+_state = {
+    'filter': None,
+    'generation': None,
+    'epoch': None,
+    'loaded_at': None,
+}
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. ``in`` may return a false
+    positive but never a false negative.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def _new_filter():
+    return BloomFilter(
+        getattr(settings, 'REVOKED_JTI_FILTER_CAPACITY', DEFAULT_CAPACITY),
+        getattr(settings, 'REVOKED_JTI_FILTER_ERROR_RATE', DEFAULT_ERROR_RATE),
+    )
+
+
+def _load(bloom, since=None):
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+    rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+    if since is not None:
+        rows = rows.filter(blacklisted_at__gte=since - RELOAD_OVERLAP)
+    for jti in rows.values_list('token__jti', flat=True).iterator(chunk_size=2000):
+        bloom.add(jti)
+
+
+def _pending_key(jti):
+    return f'{PENDING_KEY_PREFIX}{jti}'
+
+
+def _sync(shared):
+    """
+    Bring this process's filter up to date with the shared counters: a new
+    epoch (after compaction) rebuilds it, a new generation (someone else
+    blacklisted a token) or an old load reads recent revocations.
+
+    Returns whether the filter was already current.
+    """
+    generation = shared[GENERATION_KEY]
+    epoch = shared.get(EPOCH_KEY)
+    started = timezone.now()
+    max_age = timedelta(seconds=getattr(settings, 'REVOKED_JTI_RELOAD_SECONDS', DEFAULT_RELOAD_SECONDS))
+
+    if _state['filter'] is None or epoch != _state['epoch']:
+        bloom = _new_filter()
+        _load(bloom)
+        _state['filter'] = bloom
+    elif generation != _state['generation'] or started - _state['loaded_at'] > max_age:
+        # The periodic load catches revocations whose generation bump was
+        # lost, e.g. a worker killed between commit and on_commit
+        _load(_state['filter'], since=_state['loaded_at'])
+    else:
+        return True
+
+    current = generation == _state['generation'] and epoch == _state['epoch']
+    _state['generation'] = generation
+    _state['epoch'] = epoch
+    _state['loaded_at'] = started
+    return current
+
+
+def might_be_revoked(jti):
+    """
+    False means ``jti`` is certainly not blacklisted; True means the
+    blacklist table has to be checked.
+
+    The table is also checked whenever this process can't vouch for its
+    filter: the shared generation is unknown or has moved on, or ``jti``
+    is being blacklisted by a transaction that hasn't bumped it yet.
+    """
+    shared = cache.get_many([GENERATION_KEY, EPOCH_KEY, _pending_key(jti)])
+    if _pending_key(jti) in shared:
+        return True
+    known = GENERATION_KEY in shared
+    if not known:
+        # Lost with the cache, or never set; random start so a new counter
+        # never matches one a process already holds
+        cache.add(GENERATION_KEY, secrets.randbits(48), timeout=None)
+        shared[GENERATION_KEY] = cache.get(GENERATION_KEY)
+    with _lock:
+        current = _sync(shared)
+        return not (known and current) or jti in _state['filter']
+
+
+def mark_pending(jti):
+    """
+    Flag ``jti`` before its blacklist row commits, so no process screens it
+    as clean until the generation bump in ``record_revoked`` lands.
+    """
+    cache.set(
+        _pending_key(jti), True,
+        timeout=getattr(settings, 'REVOKED_JTI_PENDING_SECONDS', DEFAULT_PENDING_SECONDS),
+    )
+
+
+def record_revoked(jti):
+    """
+    Add a newly blacklisted ``jti`` here and tell other processes to load it.
+    """
+    with _lock:
+        if _state['filter'] is not None:
+            _state['filter'].add(jti)
+    cache.add(GENERATION_KEY, secrets.randbits(48), timeout=None)
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        pass
+
+
+def clear_local():
+    """
+    Forget this process's filter without touching the shared counters.
+    """
+    with _lock:
+        _state.update(filter=None, generation=None, epoch=None, loaded_at=None)
+
+
+def rebuild():
+    """
+    Start a new epoch so every process rebuilds its filter, e.g. after
+    expired tokens were deleted.
+    """
+    cache.set(EPOCH_KEY, timezone.now().isoformat(), timeout=None)
+    with _lock:
+        _state['filter'] = None
@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+ZERO = Decimal('0.00')
+
+
+def _day(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def _apply(day, service_type_id, delivery_type, **deltas):
+    """
+    Add ``deltas`` to the rollup row for one (day, service, delivery) key,
+    creating the row on first use.
+    """
+    from ..models import DailyRevenue
+
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    rows = DailyRevenue.objects.filter(
+        day=day, service_type_id=service_type_id, delivery_type=delivery_type
+    )
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            DailyRevenue.objects.create(
+                day=day, service_type_id=service_type_id, delivery_type=delivery_type, **deltas
+            )
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(**updates)
+
+
+def order_contribution(order):
+    """
+    Return the rollup key and values an order contributes, or None for an
+    order that has not been saved yet.
+    """
+    if order.created_at is None:
+        return None
+    key = (_day(order.created_at), order.service_type_id, order.delivery_type)
+    return key, (order.subtotal, order.delivery_fee)
+
+
+def record_order_change(old, new):
+    """
+    Move an order's contribution from ``old`` to ``new`` (either may be
+    None, as returned by ``order_contribution``).
+    """
+    if old == new:
+        return
+    if old is not None and new is not None and old[0] == new[0]:
+        _apply(
+            *new[0],
+            subtotal=new[1][0] - old[1][0],
+            delivery_fees=new[1][1] - old[1][1],
+        )
+        return
+    if old is not None:
+        _apply(*old[0], order_count=-1, subtotal=-old[1][0], delivery_fees=-old[1][1])
+    if new is not None:
+        _apply(*new[0], order_count=1, subtotal=new[1][0], delivery_fees=new[1][1])
+
+
+def _order_dimensions(invoice_id):
+    from ..models import Invoice
+
+    try:
+        return Invoice.objects.values_list(
+            'order__service_type_id', 'order__delivery_type'
+        ).get(pk=invoice_id)
+    except Invoice.DoesNotExist:
+        return None
+
+
+def _collect(invoice_id, payment_date, amount):
+    if not amount:
+        return
+    dimensions = _order_dimensions(invoice_id)
+    if dimensions is not None:
+        _apply(_day(payment_date), *dimensions, collected=amount)
+
+
+def record_payment_change(old_invoice_id, old_date, old_amount, invoice_id, payment_date, amount):
+    """
+    Move a payment's collected amount from its old (invoice, date) to the
+    new one. Amounts are what the payment contributes, i.e. zero unless
+    it is completed.
+    """
+    old_amount = old_amount or ZERO
+    amount = amount or ZERO
+    if old_invoice_id == invoice_id and old_date is not None and _day(old_date) == _day(payment_date):
+        _collect(invoice_id, payment_date, amount - old_amount)
+        return
+    if old_invoice_id is not None and old_date is not None:
+        _collect(old_invoice_id, old_date, -old_amount)
+    _collect(invoice_id, payment_date, amount)
@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from .. import db_router
+
+CACHE_KEY_PREFIX = 'laundry_api:statistics:'
+# Set for a replica's worth of lag after a block is invalidated
+INVALIDATED_KEY_PREFIX = 'laundry_api:statistics:invalidated:'
+DEFAULT_TTL = 30
+
+ORDERS = 'orders'
+PAYMENTS = 'payments'
+FEEDBACKS = 'feedbacks'
+
+
+def _ttl():
+    return getattr(settings, 'STATISTICS_CACHE_TTL', DEFAULT_TTL)
+
+
+def _order_statistics():
+    from ..models import Order
+
+    stats = Order.objects.aggregate(
+        total_orders=Count('id'),
+        pending_orders=Count('id', filter=Q(status='pending')),
+        processing_orders=Count('id', filter=Q(status='processing')),
+        total_revenue=Sum('total_amount'),
+    )
+    stats['total_revenue'] = float(stats['total_revenue'] or 0)
+    return stats
+
+
+def _payment_statistics():
+    from ..models import Payment
+
+    stats = Payment.objects.aggregate(
+        total_payments=Sum('amount', filter=Q(status='completed')),
+        pending_payments=Count('id', filter=Q(status='pending')),
+    )
+    stats['total_payments'] = float(stats['total_payments'] or 0)
+    return stats
+
+
+def _feedback_statistics():
+    from ..models import Feedback
+
+    # Totals and the average are derived from the distribution
+    distribution = list(
+        Feedback.objects.values('rating').annotate(count=Count('rating')).order_by('rating')
+    )
+    total = sum(row['count'] for row in distribution)
+    rating_sum = sum(row['rating'] * row['count'] for row in distribution)
+    return {
+        'average_rating': round(rating_sum / total, 2) if total else 0,
+        'total_feedbacks': total,
+        'rating_distribution': distribution,
+    }
+
+
+_BUILDERS = {
+    ORDERS: _order_statistics,
+    PAYMENTS: _payment_statistics,
+    FEEDBACKS: _feedback_statistics,
+}
+
+
+def get_statistics(*names):
+    """
+    Return ``{name: stats}`` for the requested blocks, building any that
+    are not cached with one aggregate query each.
+
+    Blocks invalidated in the last ``REPLICA_PIN_SECONDS`` are rebuilt on
+    the primary, so a lagging replica can't put the old totals back in the
+    cache for another TTL.
+    """
+    keys = {name: CACHE_KEY_PREFIX + name for name in names}
+    markers = {name: INVALIDATED_KEY_PREFIX + name for name in names}
+    cached = cache.get_many([*keys.values(), *markers.values()])
+
+    result = {}
+    missing = {}
+    for name, key in keys.items():
+        if key in cached:
+            result[name] = cached[key]
+        elif markers[name] in cached:
+            with db_router.primary_reads():
+                result[name] = missing[key] = _BUILDERS[name]()
+        else:
+            result[name] = missing[key] = _BUILDERS[name]()
+
+    if missing:
+        cache.set_many(missing, _ttl())
+    return result
+
+
+def invalidate(*names):
+    cache.delete_many([CACHE_KEY_PREFIX + name for name in names])
+    cache.set_many({INVALIDATED_KEY_PREFIX + name: True for name in names}, db_router.pin_seconds())
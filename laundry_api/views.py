@@ -1,27 +1,42 @@
 from rest_framework import viewsets, status, generics, permissions
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Count, Sum, Avg
 from rest_framework import status as drf_status
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
 from django.shortcuts import get_object_or_404
-from rest_framework_simplejwt.tokens import RefreshToken
-
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.contrib.auth.signals import user_logged_out
 
+from . import db_router
+from .authentication import ClaimsRefreshToken
 from .models import (
     Customer, Staff, GarmentType, ServiceType,
-    Order, Invoice, Payment, Feedback, User, Receipt
+    Order, Invoice, Payment, Feedback, User, Receipt, DailyRevenue
 )
 from .serializers import (
     CustomerSerializer, StaffSerializer, GarmentTypeSerializer,
     ServiceTypeSerializer, OrderSerializer, InvoiceSerializer,
     PaymentSerializer, FeedbackSerializer, RegisterSerializer,
-    UserProfileSerializer, LoginSerializer, ReceiptSerializer, OrderStatusUpdateSerializer, PaymentStatusUpdateSerializer, StaffSerializerUpdateAccount
+    UserProfileSerializer, LoginSerializer, ReceiptSerializer, OrderStatusUpdateSerializer, PaymentStatusUpdateSerializer, StaffSerializerUpdateAccount,
+    BulkOrderStatusSerializer
 )
 
-from .utils.notifications import send_sms
+from .filters import QueryParamFilterBackend
+from .throttling import AvailabilityThrottle
+from .pagination import (
+    CreatedAtPagination, IssuedDatePagination, PaymentDatePagination, GeneratedDatePagination
+)
+from .utils import availability, customer_search, events, last_login
+from .utils.catalog import get_catalog_version, get_list_data
+from .utils.conditional import make_etag, not_modified, queryset_validators, set_validators
+from .utils.fast_list import get_values_renderer
+from .utils.notifications import order_ready_key, order_ready_message, queue_sms_batch
+from .utils.query_plan import optimize_queryset
+from .utils.statistics import FEEDBACKS, ORDERS, PAYMENTS, get_statistics, invalidate as invalidate_statistics
 
 # =========================
 # AUTHENTICATION
@@ -37,7 +52,7 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
 
         return Response({
             "user": UserProfileSerializer(user).data,
@@ -56,8 +71,10 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
+        # Buffered and written with other logins instead of one UPDATE each
+        last_login.record(user.pk)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
 
         return Response({
             "user": UserProfileSerializer(user).data,
@@ -81,8 +98,10 @@ class LogoutView(APIView):
             )
 
         try:
-            token = RefreshToken(refresh_token)
+            token = ClaimsRefreshToken(refresh_token)
             token.blacklist()
+            # Drops the cached user behind the access token
+            user_logged_out.send(sender=User, request=request, user=request.user)
             return Response({"message": "Logout successful"})
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -99,7 +118,8 @@ class UserProfileView(APIView):
         return Response(UserProfileSerializer(request.user).data)
 
     def put(self, request):
-        user = request.user
+        # request.user may be built from token claims; edit the real row
+        user = User.objects.get(pk=request.user.pk)
 
         user.first_name = request.data.get("first_name", user.first_name)
         user.last_name = request.data.get("last_name", user.last_name)
@@ -128,44 +148,67 @@ class UserProfileView(APIView):
 
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([AvailabilityThrottle])
 def check_username(request):
-    username = request.data.get("username")
-    exists = User.objects.filter(username=username).exists()
+    exists = availability.is_taken("username", request.data.get("username"))
     return Response({"exists": exists})
 
 
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([AvailabilityThrottle])
 def check_email(request):
-    email = request.data.get("email")
-    exists = User.objects.filter(email=email).exists()
+    exists = availability.is_taken("email", request.data.get("email"))
     return Response({"exists": exists})
 
+def publish_order_event(event_type, order_id, order_number, order_status, assigned_washer_id, assigned_ironer_id):
+    # Staff ids let subscribed washer/ironer sockets filter server-side
+    events.publish(
+        event_type, ("order", order_id),
+        order_id=order_id,
+        order_number=order_number,
+        status=order_status,
+        assigned_washer_id=assigned_washer_id,
+        assigned_ironer_id=assigned_ironer_id,
+    )
+
+def publish_status_change(order):
+    publish_order_event(
+        events.ORDER_STATUS_CHANGED, order.id, order.order_number, order.status,
+        order.assigned_washer_id, order.assigned_ironer_id,
+    )
+
 @api_view(['PATCH'])
 @permission_classes([permissions.AllowAny])
 def update_order_status(request, pk):
     """
     Update order status only.
     """
-    order = get_object_or_404(Order, id=pk)
     new_status = request.data.get("status")
 
-    if new_status not in ['pending','processing','ready','delivered','cancelled']:
-        return Response({"detail":"Invalid status"}, status=status.HTTP_400_BAD_REQUEST)
+    with transaction.atomic():
+        # Locked, so a repeated or concurrent PATCH sees the first one's
+        # status and doesn't count as a second transition
+        order = get_object_or_404(Order.objects.select_for_update(of=("self",)), id=pk)
 
-    order.status = new_status
-    order.save(update_fields=["status"])
+        if new_status not in ['pending','processing','ready','delivered','cancelled']:
+            return Response({"detail":"Invalid status"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # ✅ Send SMS when ready
-    if new_status == "ready" and order.customer:
-        customer = order.customer  # Assuming order.customer is a ForeignKey to Customer
-        phone = customer.phone
-        if phone:
-            message = (
-                f"Hello {customer.name}, your laundry order #{order.order_number} "
-                f"is ready for pickup/delivery. Thank you!"
-            )
-            send_sms(phone, message)
+        if new_status == order.status:
+            return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
+
+        order.status = new_status
+        order.save(update_fields=["status", "updated_at"])
+        publish_status_change(order)
+
+        # ✅ Queue SMS when it becomes ready; sent by drain_notifications once this commits
+        if new_status == "ready" and order.customer:
+            customer = order.customer  # Assuming order.customer is a ForeignKey to Customer
+            queue_sms_batch([(
+                order_ready_key(order.id, order.updated_at),
+                customer.phone,
+                order_ready_message(customer.name, order.order_number),
+            )])
 
     return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
 
@@ -210,12 +253,52 @@ def update_staff_account(request, pk):
 # CORE RESOURCES
 # =========================
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class ReplicaReadMixin:
+    """
+    Runs the read-only actions in ``replica_actions`` against a read
+    replica, unless the user wrote something in the last few seconds.
+    """
+    replica_actions = ("list", "retrieve", "statistics")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and db_router.can_use_replica(request):
+            self._replica_token = db_router.use_replica()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = self.__dict__.pop("_replica_token", None)
+        if token is not None:
+            db_router.use_primary(token)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class RelatedQueryMixin:
+    """
+    Loads the relations the serializer declares up front, so list
+    responses cost a fixed number of queries whatever their length.
+    Reads trimmed with ``?fields=``/``?expand=`` also skip the columns
+    and prefetches they no longer need.
+    """
+
+    def get_queryset(self):
+        return optimize_queryset(
+            super().get_queryset(), self.get_serializer(),
+            getattr(self.pagination_class, "ordering", ()),
+        )
+
+
+class CustomerViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
 
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Counter lookup by phone, name or email prefix"""
+        customers = customer_search.search(request.query_params.get("q", ""))
+        return Response(self.get_serializer(customers, many=True).data)
+
 
-class StaffViewSet(viewsets.ModelViewSet):
+class StaffViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Staff.objects.all()
     serializer_class = StaffSerializer
 
@@ -224,80 +307,249 @@ class StaffViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
+class ValuesListMixin:
+    """
+    Serves plain list requests from ``.values()`` rows through a compiled
+    renderer that produces the same output as the serializer. Requests
+    using ``?fields=``/``?expand=`` go through the serializer as usual.
+    """
+
+    def list(self, request, *args, **kwargs):
+        renderer = get_values_renderer(self.get_serializer_class())
+        params = request.query_params
+        if renderer is None or "fields" in params or "expand" in params:
+            return super().list(request, *args, **kwargs)
+
+        queryset = renderer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(renderer.render(page))
+        return Response(renderer.render(queryset))
+
+
+class ConditionalGetMixin:
+    """
+    Answers list and retrieve requests with ETag/Last-Modified validators
+    and returns 304 Not Modified, before any serialization, when the
+    client's copy is still current.
+    """
+    conditional_field = "updated_at"
+
+    def get_list_validators(self):
+        last_modified, count = queryset_validators(
+            self.filter_queryset(self.get_queryset()), self.conditional_field
+        )
+        return make_etag(self.request.get_full_path(), last_modified, count), last_modified
+
+    def get_detail_validators(self):
+        lookup = {self.lookup_field: self.kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        last_modified = (
+            self.filter_queryset(self.get_queryset()).order_by()
+            .filter(**lookup).values_list(self.conditional_field, flat=True).first()
+        )
+        return make_etag(self.request.get_full_path(), last_modified), last_modified
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators()
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = set_validators(super().list(request, *args, **kwargs), etag, last_modified)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_detail_validators()
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = set_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+        return response
+
+
+class CatalogListMixin:
+    """
+    Serves list responses from the in-process catalog cache.
+    """
+    catalog_list_name = None
+
+    def list(self, request, *args, **kwargs):
+        return Response(get_list_data(
+            self.catalog_list_name,
+            # A plain list: serializer.data keeps the serializer, and with it
+            # the first request, alive for as long as the cache entry
+            lambda: list(self.get_serializer(self.get_queryset(), many=True).data),
+        ))
+
+
+class CatalogConditionalGetMixin(ConditionalGetMixin):
+    """
+    Catalog rows have no timestamps, so their validators come from the
+    catalog cache version, which changes on every price edit.
+    """
+
+    def get_list_validators(self):
+        return make_etag(self.request.get_full_path(), get_catalog_version()), None
 
-class GarmentTypeViewSet(viewsets.ModelViewSet):
+    def get_detail_validators(self):
+        return self.get_list_validators()
+
+
+class GarmentTypeViewSet(CatalogConditionalGetMixin, CatalogListMixin, viewsets.ModelViewSet):
     queryset = GarmentType.objects.all()
     serializer_class = GarmentTypeSerializer
+    catalog_list_name = "garment_types"
 
 
-class ServiceTypeViewSet(viewsets.ModelViewSet):
+class ServiceTypeViewSet(CatalogConditionalGetMixin, CatalogListMixin, viewsets.ModelViewSet):
     queryset = ServiceType.objects.all()
     serializer_class = ServiceTypeSerializer
+    catalog_list_name = "service_types"
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.all().order_by("-created_at")
+class OrderViewSet(ReplicaReadMixin, ConditionalGetMixin, ValuesListMixin, RelatedQueryMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.all().order_by("-created_at", "-id")
     serializer_class = OrderSerializer
-
+    pagination_class = CreatedAtPagination
+    filter_backends = [QueryParamFilterBackend]
+    filter_fields = {
+        "status": "status",
+        "customer": "customer_id",
+        "assigned_washer": "assigned_washer_id",
+        "assigned_ironer": "assigned_ironer_id",
+        "delivery_type": "delivery_type",
+    }
+    range_filter_fields = {"created": "created_at"}
+
+    @transaction.atomic
     def perform_create(self, serializer):
         order = serializer.save()
 
-        # # 🔔 EMIT REAL-TIME ADMIN NOTIFICATION
-        # channel_layer = get_channel_layer()
-
-        # async_to_sync(channel_layer.group_send)(
-        #     "admin_notifications",
-        #     {
-        #         "type": "send_notification",
-        #         "data": {
-        #             "type": "NEW_ORDER",
-        #             "order_id": order.id,
-        #             "customer": order.customer.name,
-        #             "total": str(order.total_amount),
-        #             "delivery_type": order.delivery_type,
-        #             "created_at": order.created_at.isoformat(),
-        #         },
-        #     },
-        # )
+        # 🔔 EMIT REAL-TIME ADMIN NOTIFICATION (held until commit)
+        events.publish(
+            events.NEW_ORDER, ("order", order.id),
+            order_id=order.id,
+            order_number=order.order_number,
+            customer=order.customer.name,
+            total=str(order.total_amount),
+            delivery_type=order.delivery_type,
+            status=order.status,
+            assigned_washer_id=order.assigned_washer_id,
+            assigned_ironer_id=order.assigned_ironer_id,
+            created_at=order.created_at.isoformat(),
+        )
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        previous_status = serializer.instance.status
+        order = serializer.save()
+        if order.status != previous_status:
+            publish_status_change(order)
 
     @action(detail=False, methods=["get"])
     def statistics(self, request):
-        return Response({
-            "total_orders": Order.objects.count(),
-            "pending_orders": Order.objects.filter(status="pending").count(),
-            "processing_orders": Order.objects.filter(status="processing").count(),
-            "total_revenue": float(
-                Order.objects.aggregate(Sum("total_amount"))["total_amount__sum"] or 0
+        return Response(get_statistics(ORDERS)[ORDERS])
+
+    @action(detail=False, methods=["patch"], url_path="bulk-status")
+    def bulk_status(self, request):
+        """
+        Move many orders to one status with a single UPDATE.
+
+        Unknown ids fail the whole batch. Orders whose current status can't
+        move to the target (``Order.STATUS_TRANSITIONS``) are skipped and
+        listed under ``rejected``; orders already in it are left untouched.
+        """
+        serializer = BulkOrderStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        new_status = serializer.validated_data["status"]
+
+        with transaction.atomic():
+            # Lock the orders alone, in id order; FOR UPDATE on the query
+            # below would lock the joined customers too (values() ignores of=)
+            locked = list(
+                Order.objects.select_for_update().filter(id__in=ids).order_by("id").values_list("id", flat=True)
             )
+            rows = list(
+                Order.objects.filter(id__in=locked).values(
+                    "id", "status", "order_number", "customer__name", "customer__phone",
+                    "assigned_washer_id", "assigned_ironer_id",
+                )
+            )
+            found = {row["id"] for row in rows}
+            missing = [pk for pk in ids if pk not in found]
+            if missing:
+                return Response(
+                    {"detail": "Some orders do not exist", "missing": missing},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            rejected = [
+                row for row in rows
+                if row["status"] != new_status
+                and new_status not in Order.STATUS_TRANSITIONS[row["status"]]
+            ]
+            rejected_ids = {row["id"] for row in rejected}
+            changed = [
+                row for row in rows
+                if row["status"] != new_status and row["id"] not in rejected_ids
+            ]
+            if changed:
+                changed_at = timezone.now()
+                Order.objects.filter(id__in=[row["id"] for row in changed]).update(
+                    status=new_status, updated_at=changed_at
+                )
+                # .update() skips the post_save signal that normally does this
+                transaction.on_commit(lambda: invalidate_statistics(ORDERS))
+                for row in changed:
+                    publish_order_event(
+                        events.ORDER_STATUS_CHANGED, row["id"], row["order_number"], new_status,
+                        row["assigned_washer_id"], row["assigned_ironer_id"],
+                    )
+
+                if new_status == "ready":
+                    queue_sms_batch([
+                        (
+                            order_ready_key(row["id"], changed_at),
+                            row["customer__phone"],
+                            order_ready_message(row["customer__name"], row["order_number"]),
+                        )
+                        for row in changed
+                    ])
+
+        changed_ids = {row["id"] for row in changed}
+        return Response({
+            "status": new_status,
+            "updated": [pk for pk in ids if pk in changed_ids],
+            "unchanged": [pk for pk in ids if pk not in changed_ids and pk not in rejected_ids],
+            "rejected": [
+                {"id": row["id"], "status": row["status"]}
+                for row in sorted(rejected, key=lambda row: ids.index(row["id"]))
+            ],
         })
 
 
-class InvoiceViewSet(viewsets.ModelViewSet):
-    queryset = Invoice.objects.all().order_by('-issued_date')
+class InvoiceViewSet(ReplicaReadMixin, RelatedQueryMixin, viewsets.ModelViewSet):
+    queryset = Invoice.objects.all().order_by('-issued_date', '-id')
     serializer_class = InvoiceSerializer
+    pagination_class = IssuedDatePagination
     
     @action(detail=True, methods=['get'])
     def payment_history(self, request, pk=None):
         """Get all payments for this invoice"""
         invoice = self.get_object()
-        payments = invoice.payments.all().order_by('-payment_date')
+        payments = optimize_queryset(
+            invoice.payments.all().order_by('-payment_date'), PaymentSerializer
+        )
         serializer = PaymentSerializer(payments, many=True)
         return Response(serializer.data)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
-    queryset = Payment.objects.all().order_by('-payment_date')
+class PaymentViewSet(ReplicaReadMixin, ValuesListMixin, RelatedQueryMixin, viewsets.ModelViewSet):
+    queryset = Payment.objects.all().order_by('-payment_date', '-id')
     serializer_class = PaymentSerializer
+    pagination_class = PaymentDatePagination
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        total_payments = Payment.objects.filter(status='completed').aggregate(Sum('amount'))['amount__sum'] or 0
-        pending_payments = Payment.objects.filter(status='pending').count()
-        
-        return Response({
-            'total_payments': float(total_payments),
-            'pending_payments': pending_payments
-        })
+        return Response(get_statistics(PAYMENTS)[PAYMENTS])
     
     @action(detail=True, methods=['get'])
     def receipt(self, request, pk=None):
@@ -309,29 +561,108 @@ class PaymentViewSet(viewsets.ModelViewSet):
         return Response({'error': 'Receipt not found'}, status=404)
     
 
-class ReceiptViewSet(viewsets.ReadOnlyModelViewSet):
+class ReceiptViewSet(ReplicaReadMixin, RelatedQueryMixin, viewsets.ReadOnlyModelViewSet):
     """Read-only viewset for receipts (they're auto-generated)"""
-    queryset = Receipt.objects.all().order_by('-generated_date')
+    queryset = Receipt.objects.all().order_by('-generated_date', '-id')
     serializer_class = ReceiptSerializer
+    pagination_class = GeneratedDatePagination
 
 
-class FeedbackViewSet(viewsets.ModelViewSet):
-    queryset = Feedback.objects.all().order_by("-created_at")
+class FeedbackViewSet(ReplicaReadMixin, RelatedQueryMixin, viewsets.ModelViewSet):
+    queryset = Feedback.objects.all().order_by("-created_at", "-id")
     serializer_class = FeedbackSerializer
+    pagination_class = CreatedAtPagination
 
     @action(detail=False, methods=["get"])
     def statistics(self, request):
-        return Response({
-            "average_rating": round(
-                Feedback.objects.aggregate(Avg("rating"))["rating__avg"] or 0, 2
-            ),
-            "total_feedbacks": Feedback.objects.count(),
-            "rating_distribution": list(
-                Feedback.objects.values("rating").annotate(count=Count("rating"))
-            )
-        })
+        return Response(get_statistics(FEEDBACKS)[FEEDBACKS])
+
+
+@api_view(["GET"])
+@db_router.read_from_replica
+def dashboard_statistics(request):
+    """
+    Order, payment and feedback statistics in one response.
+    """
+    return Response(get_statistics(ORDERS, PAYMENTS, FEEDBACKS))
+
+
+# =========================
+# REPORTS
+# =========================
+
+REVENUE_GRANULARITIES = {
+    "day": None,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
 
 
+@api_view(["GET"])
+@db_router.read_from_replica
+def revenue_report(request):
+    """
+    Revenue time series read from the daily rollup table.
+    """
+    granularity = request.query_params.get("granularity", "day")
+    if granularity not in REVENUE_GRANULARITIES:
+        return Response(
+            {"detail": "granularity must be one of day, week, month"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    today = timezone.localdate()
+    date_to = request.query_params.get("to")
+    date_from = request.query_params.get("from")
+    try:
+        date_to = parse_date(date_to) if date_to else today
+        date_from = parse_date(date_from) if date_from else date_to - timezone.timedelta(days=30)
+    except ValueError:
+        date_to = date_from = None
+    if date_to is None or date_from is None:
+        return Response(
+            {"detail": "from and to must be dates (YYYY-MM-DD)"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    trunc = REVENUE_GRANULARITIES[granularity]
+    rows = (
+        DailyRevenue.objects.filter(day__gte=date_from, day__lte=date_to)
+        .annotate(period=trunc("day") if trunc else F("day"))
+        .values("period")
+        .annotate(
+            orders=Sum("order_count"),
+            subtotal=Sum("subtotal"),
+            delivery_fees=Sum("delivery_fees"),
+            collected=Sum("collected"),
+        )
+        .order_by("period")
+    )
+
+    return Response({
+        "from": date_from,
+        "to": date_to,
+        "granularity": granularity,
+        "results": [
+            {
+                "period": row["period"],
+                "orders": row["orders"],
+                "subtotal": float(row["subtotal"]),
+                "delivery_fees": float(row["delivery_fees"]),
+                "revenue": float(row["subtotal"] + row["delivery_fees"]),
+                "collected": float(row["collected"]),
+            }
+            for row in rows
+        ],
+    })
+
+
+def publish_assignment(order):
+    publish_order_event(
+        events.ORDER_ASSIGNED, order.id, order.order_number, order.status,
+        order.assigned_washer_id, order.assigned_ironer_id,
+    )
+
 class AssignOrderStaffView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -371,6 +702,7 @@ class AssignOrderStaffView(APIView):
                 order.assigned_ironer = None
 
             order.save()
+            publish_assignment(order)
             return Response({"detail": "Order unassigned successfully"})
 
         # Assign
@@ -387,6 +719,7 @@ class AssignOrderStaffView(APIView):
             order.assigned_ironer = staff
 
         order.save()
+        publish_assignment(order)
 
         return Response({
             "detail": "Order assigned successfully",
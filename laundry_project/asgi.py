@@ -1,14 +1,18 @@
 import os
 from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "laundry_project.settings")
+
+# Set up Django before anything imports models
+django_asgi_app = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
+from notifications.middleware import JWTAuthMiddlewareStack
 import notifications.routing
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
-
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    "http": django_asgi_app,
+    "websocket": JWTAuthMiddlewareStack(
         URLRouter(notifications.routing.websocket_urlpatterns)
     ),
 })
@@ -1,4 +1,74 @@
+import asyncio
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+from laundry_api.utils import events
+
+DEFAULT_QUEUE_SIZE = 100
+
+# Sentinel queued in place of dropped deltas
+RESYNC = object()
+
+class OutgoingQueue:
+    """
+    Bounded per-connection send queue.
+
+    A newer delta for an object that is still queued is merged into the
+    queued one. When the queue is full everything queued is dropped and
+    replaced by a resync, so a slow client catches up with one snapshot.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.resync = False
+        self.ready = asyncio.Event()
+
+    def put(self, key, data):
+        if key in self.items and events.ORDER_REMOVED in (data.get("type"), self.items[key].get("type")):
+            # A removal and an update don't merge; the latest one wins
+            self.items[key] = dict(data)
+        elif key in self.items:
+            queued = self.items[key]
+            queued.update((name, value) for name, value in data.items() if name != "type")
+        elif len(self.items) >= self.maxsize:
+            self.request_resync()
+            return
+        else:
+            self.items[key] = dict(data)
+        self.ready.set()
+
+    def request_resync(self):
+        self.items.clear()
+        self.resync = True
+        self.ready.set()
+
+    async def get(self):
+        while not self.resync and not self.items:
+            self.ready.clear()
+            await self.ready.wait()
+        if self.resync:
+            self.resync = False
+            return RESYNC
+        return self.items.popitem(last=False)[1]
+
+def _delta_key(data):
+    if "order_id" in data:
+        return ("order", data["order_id"])
+    if "payment_id" in data:
+        return ("payment", data["payment_id"])
+    return ("seq", data.get("seq"))
+
+def _as_list(value):
+    if value is None:
+        return None
+    if not isinstance(value, list):
+        value = [value]
+    return value
 
 class AdminNotificationConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
@@ -8,12 +78,132 @@ class AdminNotificationConsumer(AsyncJsonWebsocketConsumer):
             await self.close()
             return
 
-        self.group_name = "admin_notifications"
+        self.group_name = events.ADMIN_GROUP
+        self.last_seq = 0
+        self.filters = {"types": None, "statuses": None, "staff": None}
+        # Orders this client has been sent and that still match its filters
+        self.visible = set()
+        self.queue = OutgoingQueue(getattr(settings, "ADMIN_SOCKET_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
         await self.channel_layer.group_add(self.group_name, self.channel_name)
-        await self.accept()
+        # Browsers drop the socket unless the bearer subprotocol is echoed
+        await self.accept(subprotocol=self.scope.get("auth_subprotocol"))
+
+        # A reconnecting client passes ?last_seq=N and only gets what it missed
+        await self.catch_up(self.requested_seq())
+        self.sender = asyncio.ensure_future(self.drain_queue())
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if hasattr(self, "sender"):
+            self.sender.cancel()
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    def requested_seq(self):
+        query = parse_qs(self.scope.get("query_string", b"").decode())
+        try:
+            return int(query["last_seq"][0])
+        except (KeyError, ValueError):
+            return None
+
+    async def receive_json(self, content, **kwargs):
+        """
+        {"action": "subscribe", "types": [...], "statuses": [...], "staff": id}
+
+        Each filter is optional; an omitted one lets everything through.
+        Events that don't carry a filtered field (e.g. payments under a
+        staff filter) are not sent. When an order the client has moves out
+        of its statuses or staff, it gets ``ORDER_REMOVED`` instead.
+        """
+        if content.get("action") != "subscribe":
+            await self.send_json({"type": "ERROR", "detail": "Unknown action"})
+            return
+        staff = content.get("staff")
+        try:
+            staff = int(staff) if staff is not None else None
+        except (TypeError, ValueError):
+            await self.send_json({"type": "ERROR", "detail": "Invalid staff id"})
+            return
+        self.filters = {
+            "types": _as_list(content.get("types")),
+            "statuses": _as_list(content.get("statuses")),
+            "staff": staff,
+        }
+        await self.send_json({"type": "SUBSCRIBED", "filters": self.filters})
+        # Follow up with a board that only holds the subscribed orders
+        self.queue.request_resync()
+
+    def matches(self, data):
+        if self.filters["types"] is not None and data.get("type") not in self.filters["types"]:
+            return False
+        return self.matches_order(data)
+
+    def matches_order(self, data):
+        filters = self.filters
+        if filters["statuses"] is not None and data.get("status") not in filters["statuses"]:
+            return False
+        if filters["staff"] is not None and filters["staff"] not in (
+            data.get("assigned_washer_id"), data.get("assigned_ironer_id")
+        ):
+            return False
+        return True
+
+    def route(self, data):
+        """
+        What to send this client for ``data``: the event itself, a removal
+        for an order that no longer matches, or None.
+        """
+        order_id = data.get("order_id")
+        if self.matches(data):
+            if order_id is not None:
+                self.visible.add(order_id)
+            return data
+        if order_id in self.visible and not self.matches_order(data):
+            self.visible.discard(order_id)
+            return {
+                "type": events.ORDER_REMOVED,
+                "seq": data.get("seq"),
+                "order_id": order_id,
+                "status": data.get("status"),
+            }
+        return None
+
+    async def send_snapshot(self):
+        snapshot = await database_sync_to_async(events.board_snapshot)()
+        self.last_seq = snapshot["seq"]
+        snapshot["orders"] = [order for order in snapshot["orders"] if self.matches_order(order)]
+        self.visible = {order["id"] for order in snapshot["orders"]}
+        await self.send_json(snapshot)
+
+    async def catch_up(self, last_seq):
+        missed = None
+        if last_seq is not None:
+            missed = await database_sync_to_async(events.replay)(last_seq)
+        if missed is None:
+            await self.send_snapshot()
+            return
+        for data in missed:
+            data = self.route(data)
+            if data is not None:
+                await self.send_json(data)
+        self.last_seq = missed[-1]["seq"] if missed else last_seq
+
+    async def drain_queue(self):
+        while True:
+            data = await self.queue.get()
+            if data is RESYNC:
+                await self.send_snapshot()
+            elif data.get("seq", self.last_seq + 1) > self.last_seq:
+                # Deltas up to the snapshot or replay point are already
+                # covered. Later ones can arrive slightly out of order.
+                await self.send_json(data)
 
     async def send_notification(self, event):
-        await self.send_json(event["data"])
\ No newline at end of file
+        await self.send_json(event["data"])
+
+    async def send_notifications(self, event):
+        # One channel layer message per committed transaction; filtered
+        # here so a client never receives what it didn't subscribe to
+        for data in event["events"]:
+            routed = self.route(data)
+            if routed is not None:
+                self.queue.put(_delta_key(data), routed)
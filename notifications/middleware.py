@@ -0,0 +1,60 @@
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import TokenError
+
+from laundry_api.authentication import ClaimsUser, active_user
+from laundry_api.utils import jwt_cache
+
+# new WebSocket(url, ["bearer", accessToken])
+BEARER_SUBPROTOCOL = "bearer"
+
+def token_from_scope(scope):
+    """
+    Return (token, subprotocol to accept) from ``?token=`` or the
+    ``bearer`` subprotocol pair, preferring the subprotocol.
+    """
+    subprotocols = scope.get("subprotocols") or []
+    if BEARER_SUBPROTOCOL in subprotocols:
+        index = subprotocols.index(BEARER_SUBPROTOCOL)
+        if index + 1 < len(subprotocols):
+            return subprotocols[index + 1], BEARER_SUBPROTOCOL
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    tokens = query.get("token")
+    if tokens:
+        return tokens[0], None
+    return None, None
+
+@database_sync_to_async
+def resolve_user(raw_token):
+    try:
+        claims = jwt_cache.validate_access_token(raw_token)
+    except TokenError:
+        return AnonymousUser()
+    if "role" in claims:
+        user = active_user(claims)
+        return ClaimsUser(claims, user) if user is not None else AnonymousUser()
+    return jwt_cache.get_user(claims) or AnonymousUser()
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates WebSocket connections with a SimpleJWT access token.
+
+    Connections without a token keep whatever user the inner session
+    middleware resolved.
+    """
+
+    async def __call__(self, scope, receive, send):
+        raw_token, subprotocol = token_from_scope(scope)
+        if raw_token:
+            scope = dict(scope)
+            scope["user"] = await resolve_user(raw_token)
+            scope["auth_subprotocol"] = subprotocol
+        return await super().__call__(scope, receive, send)
+
+def JWTAuthMiddlewareStack(inner):
+    return AuthMiddlewareStack(JWTAuthMiddleware(inner))